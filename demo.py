@@ -49,40 +49,47 @@ def demo_predictions():
         print(f"\n📍 {i}. ANALYZING: {location['name']}")
         print("-" * 40)
         
-        # Flood risk assessment
-        print("🌊 Flood Risk Assessment:")
-        flood_data = predictor.predict_flood_risk(
+        # All hazards in one call, evaluated concurrently
+        assessment = predictor.assess_all(
             latitude=location['lat'],
             longitude=location['lon'],
             rainfall_24h=65.0,  # Moderate rainfall
             elevation=1200,     # Average elevation
-            soil_type="loam"
+            soil_type="loam",
+            hours_ahead=12,
+            area_km2=2.0
         )
         
-        print(f"   Risk Level: {flood_data['risk_level']} ({flood_data['risk_score']:.2f})")
-        print(f"   Recommendation: {flood_data['recommendations'][0]}")
+        if 'error' in assessment:
+            print(f"❌ {assessment['error']}")
+            continue
+        
+        # Flood risk assessment
+        print("🌊 Flood Risk Assessment:")
+        flood_data = assessment['flood']
+        if 'error' in flood_data:
+            print(f"   ⚠️ {flood_data['error']}")
+        else:
+            print(f"   Risk Level: {flood_data['risk_level']} ({flood_data['risk_score']:.2f})")
+            print(f"   Recommendation: {flood_data['recommendation']}")
         
         # Air quality forecast
         print("\n🌫️ Air Quality Forecast:")
-        aqi_data = predictor.predict_air_quality(
-            latitude=location['lat'],
-            longitude=location['lon'],
-            hours_ahead=12
-        )
-        
-        print(f"   Average AQI: {aqi_data['average_aqi']} ({aqi_data['predictions'][0]['category']})")
-        print(f"   Health Advice: {aqi_data['health_recommendations'][0]}")
+        aqi_data = assessment['air_quality']
+        if 'error' in aqi_data:
+            print(f"   ⚠️ {aqi_data['error']}")
+        else:
+            print(f"   Average AQI: {aqi_data['average_aqi']} ({aqi_data['category']})")
+            print(f"   Health Advice: {aqi_data['health_advice']}")
         
         # Deforestation risk
         print("\n🌳 Deforestation Risk:")
-        deforest_data = predictor.analyze_deforestation_risk(
-            latitude=location['lat'],
-            longitude=location['lon'],
-            area_km2=2.0
-        )
-        
-        print(f"   Risk Level: {deforest_data['risk_level']} ({deforest_data['deforestation_risk']:.2f})")
-        print(f"   Action: {deforest_data['conservation_actions'][0]}")
+        deforest_data = assessment['deforestation']
+        if 'error' in deforest_data:
+            print(f"   ⚠️ {deforest_data['error']}")
+        else:
+            print(f"   Risk Level: {deforest_data['risk_level']} ({deforest_data['deforestation_risk']:.2f})")
+            print(f"   Action: {deforest_data['conservation_action']}")
         
         if i < len(locations):
             input("\nPress Enter to continue to next location...")
@@ -115,20 +122,29 @@ def interactive_demo():
         predictor.load_models()
         
         # Comprehensive analysis
-        flood_result = predictor.predict_flood_risk(lat, lon, rainfall, 1500, "loam")
-        aqi_result = predictor.predict_air_quality(lat, lon, 6)
-        deforest_result = predictor.analyze_deforestation_risk(lat, lon, 1.0)
+        assessment = predictor.assess_all(latitude=lat, longitude=lon, rainfall_24h=rainfall,
+                                          elevation=1500, soil_type="loam", hours_ahead=6)
+        if 'error' in assessment:
+            print(f"❌ {assessment['error']}")
+            return
+        flood_result = assessment['flood']
+        aqi_result = assessment['air_quality']
+        deforest_result = assessment['deforestation']
         
         print("\n📊 ENVIRONMENTAL RISK SUMMARY")
         print("-" * 30)
-        print(f"🌊 Flood Risk: {flood_result['risk_level']} ({flood_result['risk_score']:.2f})")
-        print(f"🌫️ Air Quality: {aqi_result['average_aqi']} AQI")
-        print(f"🌳 Deforestation: {deforest_result['risk_level']} ({deforest_result['deforestation_risk']:.2f})")
+        if 'error' not in flood_result:
+            print(f"🌊 Flood Risk: {flood_result['risk_level']} ({flood_result['risk_score']:.2f})")
+        if 'error' not in aqi_result:
+            print(f"🌫️ Air Quality: {aqi_result['average_aqi']} AQI")
+        if 'error' not in deforest_result:
+            print(f"🌳 Deforestation: {deforest_result['risk_level']} ({deforest_result['deforestation_risk']:.2f})")
+        print(f"⚠️ Overall: {assessment['overall_risk_level']}")
         
         print("\n💡 KEY RECOMMENDATIONS:")
-        print(f"• {flood_result['recommendations'][0]}")
-        print(f"• {aqi_result['health_recommendations'][0]}")
-        print(f"• {deforest_result['conservation_actions'][0]}")
+        for result, advice in ((flood_result, 'recommendation'), (aqi_result, 'health_advice'),
+                               (deforest_result, 'conservation_action')):
+            print(f"• {result.get(advice, result.get('error'))}")
         
     except ValueError:
         print("❌ Invalid input. Please enter numeric values.")
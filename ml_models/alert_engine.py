@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Flood Alert Change-Detection Engine
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Remembers the last alerted flood risk level of every location in compact
+arrays and, after each scan, emits only real transitions so that
+re-running a national scan does not re-alert everyone.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ecosentinel_predictor import EcoSentinelPredictor, RISK_LEVELS
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_LEVEL = -1
+
+
+class FloodAlertEngine:
+    """
+    Vectorized alert state machine for thousands of locations.
+
+    A location moves up a level only when its score clears the level
+    threshold plus the hysteresis band, and moves down only when it falls
+    below the threshold minus the band, so scores hovering around 0.4 or
+    0.7 do not flap. Escalations are emitted immediately; de-escalations
+    wait until the cooldown since the location's last alert has passed.
+    """
+
+    def __init__(self,
+                 thresholds: Sequence[float] = (0.4, 0.7),
+                 hysteresis: float = 0.05,
+                 cooldown_seconds: float = 3600.0,
+                 alert_on_first_seen: bool = True):
+        """
+        Args:
+            thresholds: Score thresholds for MEDIUM and HIGH risk
+            hysteresis: Half-width of the band around each threshold
+            cooldown_seconds: Minimum time between a location's alerts
+                before a de-escalation is emitted
+            alert_on_first_seen: Emit an alert when a location is first
+                seen above LOW risk
+        """
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.hysteresis = hysteresis
+        self.cooldown_seconds = cooldown_seconds
+        self.alert_on_first_seen = alert_on_first_seen
+
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._levels = np.full(0, UNKNOWN_LEVEL, dtype=np.int8)
+        self._last_alert_at = np.full(0, -np.inf, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _rows_for(self, location_ids: Sequence[str]) -> np.ndarray:
+        """Map location ids to state rows, growing the arrays for new ids"""
+        rows = np.empty(len(location_ids), dtype=np.int64)
+        for i, location_id in enumerate(location_ids):
+            row = self._index.get(location_id)
+            if row is None:
+                row = len(self._ids)
+                self._index[location_id] = row
+                self._ids.append(location_id)
+            rows[i] = row
+
+        size = len(self._ids)
+        if size > len(self._levels):
+            capacity = max(size, 2 * len(self._levels), 1024)
+            levels = np.full(capacity, UNKNOWN_LEVEL, dtype=np.int8)
+            levels[:len(self._levels)] = self._levels
+            last_alert_at = np.full(capacity, -np.inf, dtype=np.float64)
+            last_alert_at[:len(self._last_alert_at)] = self._last_alert_at
+            self._levels, self._last_alert_at = levels, last_alert_at
+        return rows
+
+    def update(self,
+               location_ids: Sequence[str],
+               risk_scores,
+               now: Optional[float] = None) -> List[Dict]:
+        """
+        Apply one scan's risk scores and return the alert-worthy transitions.
+
+        Args:
+            location_ids: Identifier of each scanned location
+            risk_scores: Flood risk score (0-1) of each scanned location
+            now: Scan time as a UNIX timestamp (default: current time)
+
+        Returns:
+            List of transitions with location_id, previous_level,
+            risk_level, risk_score and alert_message
+        """
+        now = time.time() if now is None else now
+        scores = np.asarray(risk_scores, dtype=np.float64)
+        if len(scores) != len(location_ids):
+            raise ValueError("location_ids and risk_scores must have the same length")
+
+        rows = self._rows_for(location_ids)
+        previous = self._levels[rows].astype(np.int8)
+
+        # Level a location would reach going up vs. the level it keeps going down
+        level_up = (scores[:, None] > self.thresholds + self.hysteresis).sum(axis=1)
+        level_down = (scores[:, None] > self.thresholds - self.hysteresis).sum(axis=1)
+        level_raw = (scores[:, None] > self.thresholds).sum(axis=1)
+
+        new_levels = np.where(level_up > previous, level_up,
+                              np.where(level_down < previous, level_down, previous))
+        first_seen = previous == UNKNOWN_LEVEL
+        new_levels = np.where(first_seen, level_raw, new_levels).astype(np.int8)
+
+        escalated = ~first_seen & (new_levels > previous)
+        cooled_down = (now - self._last_alert_at[rows]) >= self.cooldown_seconds
+        deescalated = ~first_seen & (new_levels < previous) & cooled_down
+        emit = escalated | deescalated
+        if self.alert_on_first_seen:
+            emit |= first_seen & (new_levels > 0)
+
+        # Suppressed de-escalations keep their previous level until the cooldown passes
+        commit = emit | first_seen | (new_levels > previous)
+        self._levels[rows[commit]] = new_levels[commit]
+        self._last_alert_at[rows[emit]] = now
+
+        transitions = []
+        for i in np.flatnonzero(emit):
+            before = None if first_seen[i] else RISK_LEVELS[previous[i]]
+            after = RISK_LEVELS[new_levels[i]]
+            transitions.append({
+                "location_id": location_ids[i],
+                "previous_level": before,
+                "risk_level": after,
+                "risk_score": round(float(scores[i]), 3),
+                "alert_message": self._transition_message(location_ids[i], before, after)
+            })
+
+        logger.info(f"Alert scan: {len(scores)} locations, {len(transitions)} transitions")
+        return transitions
+
+    def scan(self,
+             predictor: EcoSentinelPredictor,
+             location_ids: Sequence[str],
+             rainfall_24h,
+             elevation,
+             soil_type="loam",
+             now: Optional[float] = None) -> List[Dict]:
+        """Score a batch of locations with the flood model and apply the result"""
+        result = predictor.predict_flood_risk_batch(rainfall_24h, elevation, soil_type)
+        return self.update(location_ids, result["risk_score"], now)
+
+    def current_levels(self) -> Dict[str, Optional[str]]:
+        """Return the last alerted risk level of every known location"""
+        return {
+            location_id: RISK_LEVELS[level] if level != UNKNOWN_LEVEL else None
+            for location_id, level in zip(self._ids, self._levels[:len(self._ids)])
+        }
+
+    def save(self, path: str):
+        """Persist the alert state so scans can resume after a restart"""
+        size = len(self._ids)
+        np.savez_compressed(path,
+                            ids=np.asarray(self._ids, dtype=str),
+                            levels=self._levels[:size],
+                            last_alert_at=self._last_alert_at[:size])
+
+    def load(self, path: str):
+        """Restore alert state written by save()"""
+        with np.load(path) as state:
+            self._ids = [str(location_id) for location_id in state["ids"]]
+            self._levels = state["levels"].astype(np.int8)
+            self._last_alert_at = state["last_alert_at"].astype(np.float64)
+        self._index = {location_id: row for row, location_id in enumerate(self._ids)}
+
+    def _transition_message(self, location_id: str, before: Optional[str], after: str) -> str:
+        """Generate the alert text for a level transition"""
+        if before is not None and RISK_LEVELS.index(after) < RISK_LEVELS.index(before):
+            return f"⬇️ Flood risk in {location_id} lowered from {before} to {after}."
+        if after == "HIGH":
+            return f"⚠️ HIGH flood risk in {location_id}. Immediate action required!"
+        elif after == "MEDIUM":
+            return f"⚡ MEDIUM flood risk in {location_id}. Stay alert!"
+        return f"✅ LOW flood risk in {location_id}. Conditions normal."
+
+
+def main():
+    """Demo: two scans ten minutes apart only alert on what changed"""
+    print("🚨 EcoSentinel AI - Flood Alert Engine")
+    print("=" * 45)
+
+    predictor = EcoSentinelPredictor()
+    engine = FloodAlertEngine()
+
+    rng = np.random.default_rng(42)
+    n = 10000
+    location_ids = [f"ward-{i:05d}" for i in range(n)]
+    elevation = rng.uniform(0, 2500, n)
+    rainfall = rng.gamma(2.0, 20.0, n)
+
+    start = time.time()
+    first = engine.scan(predictor, location_ids, rainfall, elevation, now=start)
+    second = engine.scan(predictor, location_ids, rainfall + rng.normal(0, 2, n), elevation, now=start + 600)
+
+    print(f"First scan:  {len(first)} alerts for {n} locations")
+    print(f"Second scan: {len(second)} alerts after small rainfall changes")
+    for transition in second[:3]:
+        print(f"   {transition['alert_message']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Resumable Batch Prediction Runner
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Command-line entry point for running predictions over large CSV or
+Parquet location files. Input is read in chunks, scored in parallel
+worker processes, written incrementally, and checkpointed after every
+chunk so a crashed job resumes where it stopped.
+
+Usage:
+    python batch_runner.py locations.csv results.csv --hazards flood,air_quality
+    python batch_runner.py locations.parquet results/ --workers 8 --chunk-size 100000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ecosentinel_predictor import EcoSentinelPredictor, RISK_LEVELS
+
+logger = logging.getLogger(__name__)
+
+HAZARDS = ("flood", "air_quality", "deforestation")
+REQUIRED_COLUMNS = {
+    "flood": ("latitude", "longitude", "rainfall_24h", "elevation"),
+    "air_quality": ("latitude", "longitude"),
+    "deforestation": ("latitude", "longitude")
+}
+
+# One predictor per worker process, created by the pool initializer
+_worker_predictor: Optional[EcoSentinelPredictor] = None
+
+
+def _load_predictor():
+    global _worker_predictor
+    _worker_predictor = EcoSentinelPredictor()
+    _worker_predictor.load_models()
+
+
+def _init_worker():
+    logging.getLogger().setLevel(logging.WARNING)
+    _load_predictor()
+
+
+def average_aqi(predictor: EcoSentinelPredictor, latitudes, longitudes, hours_ahead) -> np.ndarray:
+    """
+    Mean forecast AQI per location.
+
+    Locations covered by the station AQI model are forecast together with
+    one batched call per distinct horizon; the rest fall back to
+    predict_air_quality.
+    """
+    model = predictor.aqi_model
+    stations = np.full(len(latitudes), -1, dtype=np.int64)
+    if model:
+        for i, (lat, lon) in enumerate(zip(latitudes, longitudes)):
+            station = model.nearest_station(lat, lon)
+            stations[i] = -1 if station is None else station
+
+    averages = np.empty(len(stations))
+    covered = stations >= 0
+    start = datetime.now(timezone.utc)
+    for hours in np.unique(hours_ahead[covered]):
+        rows = np.flatnonzero(covered & (hours_ahead == hours))
+        forecast = model.forecast(int(hours), start=start, rows=stations[rows])
+        averages[rows] = np.round(forecast.mean(axis=1, dtype=np.float64), 1)
+    for i in np.flatnonzero(~covered):
+        averages[i] = predictor.predict_air_quality(latitudes[i], longitudes[i], int(hours_ahead[i]))["average_aqi"]
+    return averages
+
+
+def score_chunk(chunk: pd.DataFrame, hazards: List[str], predictor: Optional[EcoSentinelPredictor] = None) -> pd.DataFrame:
+    """
+    Run the selected hazards over one chunk of locations.
+
+    Args:
+        chunk: Location rows (latitude, longitude and hazard inputs)
+        hazards: Hazards to evaluate
+        predictor: Predictor to use (default: the worker process predictor)
+
+    Returns:
+        DataFrame with identifying columns and one result column per output
+    """
+    predictor = predictor or _worker_predictor
+    id_columns = [c for c in ("id", "name", "latitude", "longitude") if c in chunk.columns]
+    result = chunk[id_columns].copy()
+
+    if "flood" in hazards:
+        # Elevation and soil type missing from the input come from the static feature grid
+        elevation = (pd.to_numeric(chunk["elevation"], errors="coerce").to_numpy(dtype=np.float64)
+                     if "elevation" in chunk.columns else None)
+        elevation, soil_type = predictor.fill_static_features(
+            chunk["latitude"].to_numpy(), chunk["longitude"].to_numpy(), elevation,
+            chunk["soil_type"].to_numpy() if "soil_type" in chunk.columns else None)
+        rainfall_24h = pd.to_numeric(chunk["rainfall_24h"], errors="coerce").to_numpy(dtype=np.float64)
+        flood = predictor.predict_flood_risk_batch(np.nan_to_num(rainfall_24h), elevation, soil_type)
+        # Rows without usable rainfall or elevation (e.g. outside the feature grid)
+        # are marked invalid rather than scored as LOW
+        valid = np.isfinite(rainfall_24h) & np.isfinite(elevation)
+        result["flood_risk_score"] = np.where(valid, np.round(flood["risk_score"], 3), np.nan)
+        result["flood_risk_level"] = np.where(valid, np.asarray(RISK_LEVELS, dtype=object)[flood["risk_level_code"]], None)
+
+    if "air_quality" in hazards:
+        hours_ahead = chunk["hours_ahead"].to_numpy(dtype=np.int64) if "hours_ahead" in chunk.columns else np.full(len(chunk), 24)
+        result["average_aqi"] = average_aqi(predictor, chunk["latitude"].to_numpy(), chunk["longitude"].to_numpy(),
+                                            hours_ahead)
+
+    if "deforestation" in hazards:
+        area_km2 = chunk["area_km2"].to_numpy() if "area_km2" in chunk.columns else np.ones(len(chunk))
+        analyses = [
+            predictor.analyze_deforestation_risk(lat, lon, float(area))
+            for lat, lon, area in zip(chunk["latitude"], chunk["longitude"], area_km2)
+        ]
+        result["deforestation_risk"] = [a["deforestation_risk"] for a in analyses]
+        result["deforestation_risk_level"] = [a["risk_level"] for a in analyses]
+
+    return result
+
+
+def _score_in_worker(args):
+    index, chunk, hazards = args
+    return index, score_chunk(chunk, hazards)
+
+
+class BatchRunner:
+    """
+    Chunked, checkpointed, parallel prediction job over one input file.
+
+    CSV output is appended to a single file whose committed size is stored
+    in the checkpoint, so a partially written chunk is truncated away on
+    resume. Parquet output is written as one part file per chunk.
+    """
+
+    def __init__(self,
+                 input_path: str,
+                 output_path: str,
+                 hazards: List[str],
+                 chunk_size: int = 50000,
+                 workers: int = 1,
+                 checkpoint_path: Optional[str] = None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.hazards = hazards
+        self.chunk_size = chunk_size
+        self.workers = max(1, workers)
+        self.checkpoint_path = checkpoint_path or f"{output_path.rstrip('/')}.checkpoint.json"
+        self.input_format = "parquet" if input_path.endswith((".parquet", ".pq")) else "csv"
+        self.output_format = "csv" if output_path.endswith(".csv") else "parquet"
+
+    def total_rows(self) -> Optional[int]:
+        """Count input rows for ETA reporting"""
+        if self.input_format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(self.input_path).metadata.num_rows
+
+        lines = 0
+        with open(self.input_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 24), b""):
+                lines += block.count(b"\n")
+        return max(0, lines - 1)  # minus header
+
+    def columns(self) -> List[str]:
+        """Column names of the input file"""
+        if self.input_format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(self.input_path).schema_arrow.names
+        return list(pd.read_csv(self.input_path, nrows=0).columns)
+
+    def read_chunks(self, skip_chunks: int = 0) -> Iterator[pd.DataFrame]:
+        """Yield input chunks, skipping the ones already completed"""
+        if self.input_format == "parquet":
+            import pyarrow.parquet as pq
+            batches = pq.ParquetFile(self.input_path).iter_batches(batch_size=self.chunk_size)
+            # Completed batches are skipped before the pandas conversion
+            chunks = (batch.to_pandas() if index >= skip_chunks else None for index, batch in enumerate(batches))
+        else:
+            chunks = pd.read_csv(self.input_path, chunksize=self.chunk_size,
+                                 skiprows=range(1, skip_chunks * self.chunk_size + 1))
+            skip_chunks = 0
+
+        for index, chunk in enumerate(chunks):
+            if index >= skip_chunks and chunk is not None and len(chunk):
+                yield chunk
+
+    def load_checkpoint(self) -> Dict:
+        if not os.path.exists(self.checkpoint_path):
+            return {"chunks_done": 0, "rows_done": 0, "output_bytes": 0}
+
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("chunk_size") != self.chunk_size or checkpoint.get("hazards") != self.hazards:
+            raise ValueError("Checkpoint was written with a different chunk size or hazard list; "
+                             "use the original settings or delete the checkpoint")
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint: Dict):
+        checkpoint.update({"input": self.input_path, "chunk_size": self.chunk_size, "hazards": self.hazards})
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def write_chunk(self, index: int, result: pd.DataFrame, checkpoint: Dict):
+        """Append one scored chunk to the output"""
+        if self.output_format == "csv":
+            with open(self.output_path, "ab") as f:
+                f.truncate(checkpoint["output_bytes"])
+                result.to_csv(f, header=checkpoint["output_bytes"] == 0, index=False)
+                f.flush()
+                os.fsync(f.fileno())
+                checkpoint["output_bytes"] = f.tell()
+        else:
+            os.makedirs(self.output_path, exist_ok=True)
+            result.to_parquet(os.path.join(self.output_path, f"part-{index:06d}.parquet"), index=False)
+
+    def run(self) -> Dict:
+        """Run (or resume) the job and return final throughput statistics"""
+        checkpoint = self.load_checkpoint()
+        total = self.total_rows()
+        start_rows = checkpoint["rows_done"]
+        if start_rows:
+            logger.info(f"Resuming after {checkpoint['chunks_done']} chunks ({start_rows} rows)")
+
+        started = time.perf_counter()
+        chunks = self.read_chunks(skip_chunks=checkpoint["chunks_done"])
+
+        def on_result(index: int, result: pd.DataFrame):
+            self.write_chunk(index, result, checkpoint)
+            checkpoint["chunks_done"] = index + 1
+            checkpoint["rows_done"] += len(result)
+            self.save_checkpoint(checkpoint)
+            self._report(checkpoint["rows_done"], start_rows, total, started)
+
+        first_index = checkpoint["chunks_done"]
+        if self.workers == 1:
+            _load_predictor()
+            for index, chunk in enumerate(chunks, start=first_index):
+                on_result(index, score_chunk(chunk, self.hazards))
+        else:
+            # Bounded in-flight window keeps memory flat and writes in input order
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker) as pool:
+                in_flight = deque()
+                for index, chunk in enumerate(chunks, start=first_index):
+                    in_flight.append(pool.submit(_score_in_worker, (index, chunk, self.hazards)))
+                    if len(in_flight) >= 2 * self.workers:
+                        on_result(*in_flight.popleft().result())
+                while in_flight:
+                    on_result(*in_flight.popleft().result())
+
+        elapsed = time.perf_counter() - started
+        processed = checkpoint["rows_done"] - start_rows
+        return {
+            "rows_done": checkpoint["rows_done"],
+            "rows_this_run": processed,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(processed / elapsed, 1) if elapsed > 0 else None
+        }
+
+    def _report(self, rows_done: int, start_rows: int, total: Optional[int], started: float):
+        elapsed = time.perf_counter() - started
+        rate = (rows_done - start_rows) / elapsed if elapsed > 0 else 0
+        progress = f"{rows_done:,} rows"
+        if total and rate > 0:
+            eta = (total - rows_done) / rate
+            progress = f"{rows_done:,}/{total:,} rows ({rows_done / total:.1%}), ETA {eta:,.0f}s"
+        print(f"📈 {progress} @ {rate:,.0f} rows/s", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="EcoSentinel AI batch prediction runner")
+    parser.add_argument("input", help="Input CSV or Parquet file of locations")
+    parser.add_argument("output", help="Output .csv file, or directory for Parquet part files")
+    parser.add_argument("--hazards", default="flood",
+                        help=f"Comma-separated hazards to run ({', '.join(HAZARDS)})")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per chunk (default: 50000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint.json)")
+    args = parser.parse_args(argv)
+
+    hazards = [h.strip() for h in args.hazards.split(",") if h.strip()]
+    unknown = [h for h in hazards if h not in HAZARDS]
+    if unknown:
+        parser.error(f"Unknown hazards: {', '.join(unknown)}")
+
+    runner = BatchRunner(args.input, args.output, hazards,
+                         chunk_size=args.chunk_size, workers=args.workers,
+                         checkpoint_path=args.checkpoint)
+
+    required = {c for h in hazards for c in REQUIRED_COLUMNS[h]}
+    if os.getenv('STATIC_FEATURES_DIR'):
+        required.discard("elevation")  # Looked up from the static feature grid
+    missing = sorted(required - set(runner.columns()))
+    if missing:
+        parser.error(f"Input is missing columns: {', '.join(missing)}")
+
+    print(f"🌍 EcoSentinel AI batch run: {args.input} -> {args.output} ({', '.join(hazards)})")
+    stats = runner.run()
+    print(f"✅ Done: {stats['rows_done']:,} rows, {stats['rows_this_run']:,} this run "
+          f"in {stats['elapsed_seconds']}s ({stats['rows_per_second']} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
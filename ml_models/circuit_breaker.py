@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Circuit Breaker and Hedged Requests
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Resilience helpers for upstream weather APIs. A per-endpoint circuit
+breaker stops callers from waiting on an endpoint that is down or slow,
+and hedged requests cut tail latency by racing a duplicate call once the
+original runs past the observed p95.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError, wait
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for one upstream endpoint.
+
+    Errors and calls slower than latency_threshold both count as failures.
+    After failure_threshold consecutive failures the breaker opens and
+    callers short-circuit for reset_timeout seconds; then a single probe
+    is let through (half-open) and its outcome closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = 3,
+                 latency_threshold: float = 3.0,
+                 reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go upstream now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"Circuit '{self.name}' half-open, probing upstream")
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency: float):
+        """Record a completed call; slow calls count as failures"""
+        if latency > self.latency_threshold:
+            self.record_failure(reason=f"slow call ({latency:.2f}s)")
+            return
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Give up a half-open probe whose outcome will never be recorded"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self, reason: str = "error"):
+        """Record a failed call, opening the circuit when the threshold is hit"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit '{self.name}' opened after {reason}")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def add(self, latency: float):
+        with self._lock:
+            self.samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile, or None until enough samples are recorded"""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            return float(np.percentile(self.samples, q))
+
+
+class HedgedRequester:
+    """
+    Runs idempotent calls with an optional hedged duplicate.
+
+    If the first attempt has not finished after hedge_after seconds, a
+    second identical attempt is started and whichever succeeds first wins.
+    The losing attempt is left to finish on its own thread.
+    """
+
+    def __init__(self, max_workers: int = 16, min_hedge_delay: float = 0.2):
+        self.min_hedge_delay = min_hedge_delay
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ecosentinel-hedge")
+
+    def call(self, fn: Callable, hedge_after: Optional[float] = None, timeout: Optional[float] = None):
+        """
+        Call fn, hedging after hedge_after seconds (no hedge if None).
+
+        Args:
+            fn: Idempotent callable to run
+            hedge_after: Seconds to wait before sending a hedged duplicate
+            timeout: Overall time to wait for a result (default: unbounded)
+
+        Raises:
+            TimeoutError if no attempt succeeds within timeout, otherwise
+            the exception of the last attempt if every attempt fails
+        """
+        if hedge_after is None and timeout is None:
+            return fn()
+
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        primary = self._executor.submit(fn)
+        hedge_delay = max(self.min_hedge_delay, hedge_after) if hedge_after is not None else None
+        if hedge_delay is None or (timeout is not None and timeout <= hedge_delay):
+            return primary.result(timeout=timeout)
+
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        self.hedges_sent += 1
+        hedge = self._executor.submit(fn)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            remaining = max(0.0, expires_at - time.monotonic()) if expires_at is not None else None
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError()
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    self.hedges_won += 1
+                return result
+        raise error
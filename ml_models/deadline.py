@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - End-to-End Latency Budgets
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+A Deadline is created once per user-facing call (e.g. 1.5 s for USSD and
+voice channels) and passed down through every sub-call, so each stage
+only spends the time that remains.
+"""
+
+import time
+from typing import Optional, Union
+
+
+class Deadline:
+    """Monotonic-clock deadline shared by all stages of one request"""
+
+    def __init__(self, budget_seconds: float):
+        self.budget = budget_seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_seconds
+
+    @classmethod
+    def coerce(cls, value: Union["Deadline", float, None]) -> Optional["Deadline"]:
+        """Accept an existing Deadline, a budget in seconds, or None (no deadline)"""
+        if value is None or isinstance(value, Deadline):
+            return value
+        return cls(float(value))
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        """Seconds spent since the deadline was created"""
+        return time.monotonic() - self.started_at
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def cap(self, timeout: float) -> float:
+        """Shrink a stage timeout so it ends no later than the deadline"""
+        return min(timeout, self.remaining())
+
+    def summary(self) -> dict:
+        """Budget accounting for inclusion in results"""
+        return {
+            "budget_ms": round(self.budget * 1000, 1),
+            "elapsed_ms": round(self.elapsed() * 1000, 1),
+            "exceeded": self.expired()
+        }
@@ -0,0 +1,721 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Priority-Flood Hydrological Routing
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Routes rainfall over a DEM grid: fills depressions, assigns D8 flow
+directions and accumulates upstream runoff, so flood risk reflects where
+water collects (valley floors, informal settlements on drainage lines)
+and not just how low a cell is.
+
+Large grids are processed in tiles, following the parallel
+priority-flood scheme of Barnes (2016):
+
+1. Each tile is flooded from its perimeter (O(n log n) priority queue);
+   the perimeter cells become nodes of a small spill graph whose edges
+   carry the elevation at which neighbouring watersheds connect.
+2. The spill graph is solved globally (minimum spanning tree + pointer
+   jumping) for the water level of every perimeter cell.
+3. Each tile is flooded again from perimeter cells seeded at their final
+   levels. Cells then drain by steepest descent on the filled surface,
+   reading one cell of the neighbouring tiles, so directions do not
+   depend on the tiling; on flats, where nothing is lower, a cell drains
+   towards the cell that flooded it, which routes water across flats and
+   out of depressions.
+4. Flow is accumulated per tile with vectorized frontier passes, the
+   inflows between tiles are resolved on the perimeter graph, and the
+   tiles are accumulated once more with those inflows.
+
+Only a few tiles are in memory at a time; inputs and outputs can be
+memory-mapped .npy files.
+"""
+
+import heapq
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy import ndimage
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import breadth_first_order, minimum_spanning_tree
+
+logger = logging.getLogger(__name__)
+
+# D8 neighbour offsets; direction code k points to D8_OFFSETS[k], and 7 - k is its opposite
+D8_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+D8_ROWS = np.array([dr for dr, _ in D8_OFFSETS], dtype=np.int64)
+D8_COLS = np.array([dc for _, dc in D8_OFFSETS], dtype=np.int64)
+OUTLET = -1   # Drains off the grid
+NODATA = -2   # No elevation
+
+OCEAN_LABEL = -1
+BORDER_LABEL = -2
+
+
+def _perimeter_flat(height: int, width: int) -> np.ndarray:
+    """Row-major flat indices of a tile's perimeter cells"""
+    mask = np.zeros((height, width), dtype=bool)
+    mask[[0, -1], :] = True
+    mask[:, [0, -1]] = True
+    return np.flatnonzero(mask)
+
+
+def _perimeter_position(rows: np.ndarray, cols: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Position in _perimeter_flat order of perimeter cells given by local coordinates"""
+    per_middle_row = 1 if width == 1 else 2
+    middle = width + per_middle_row * (rows - 1) + ((cols == width - 1) & (width > 1))
+    last = width + per_middle_row * (height - 2) + cols
+    return np.where(rows == 0, cols, np.where(rows == height - 1, last, middle))
+
+
+def _padded(tile: np.ndarray, fill) -> np.ndarray:
+    padded = np.full((tile.shape[0] + 2, tile.shape[1] + 2), fill, dtype=tile.dtype)
+    padded[1:-1, 1:-1] = tile
+    return padded
+
+
+def _ocean_seeds(valid: np.ndarray) -> np.ndarray:
+    """Nodata cells touching valid cells, which act as outlets"""
+    return ndimage.binary_dilation(valid, structure=np.ones((3, 3), dtype=bool)) & ~valid
+
+
+def label_tile(dem: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stage 1: flood a tile from its perimeter and record where watersheds meet.
+
+    Args:
+        dem: Tile elevations, NaN for nodata
+
+    Returns:
+        (label_a, label_b, spill_elevation) edge arrays. Labels are
+        perimeter positions + 1, or OCEAN_LABEL for nodata outlets.
+    """
+    height, width = dem.shape
+    stride = width + 2
+    valid = ~np.isnan(dem)
+
+    labels = _padded(np.where(valid, 0, OCEAN_LABEL).astype(np.int64), BORDER_LABEL)
+    filled = _padded(dem.astype(np.float64), np.nan)
+    perimeter = _perimeter_flat(height, width)
+    padded_perimeter = (perimeter // width + 1) * stride + perimeter % width + 1
+
+    heap = []
+    for position, index in enumerate(padded_perimeter.tolist()):
+        if labels.flat[index] == 0:
+            labels.flat[index] = position + 1
+            heap.append((filled.flat[index], index))
+    ocean = np.flatnonzero(_padded(_ocean_seeds(valid), False))
+    filled.flat[ocean] = -np.inf
+    heap.extend((-np.inf, index) for index in ocean.tolist())
+    heapq.heapify(heap)
+
+    labels, filled = labels.ravel().tolist(), filled.ravel().tolist()
+    offsets = [dr * stride + dc for dr, dc in D8_OFFSETS]
+    edges: Dict[Tuple[int, int], float] = {}
+    heappop, heappush = heapq.heappop, heapq.heappush
+
+    while heap:
+        level, cell = heappop(heap)
+        label = labels[cell]
+        for offset in offsets:
+            neighbor = cell + offset
+            neighbor_label = labels[neighbor]
+            if neighbor_label == 0:
+                labels[neighbor] = label
+                elevation = filled[neighbor]
+                if elevation < level:
+                    elevation = level
+                    filled[neighbor] = level
+                heappush(heap, (elevation, neighbor))
+            elif neighbor_label != label and neighbor_label != BORDER_LABEL:
+                key = (label, neighbor_label) if label < neighbor_label else (neighbor_label, label)
+                spill = level if level > filled[neighbor] else filled[neighbor]
+                if spill < edges.get(key, np.inf):
+                    edges[key] = spill
+
+    if not edges:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+    pairs = np.array(list(edges.keys()), dtype=np.int64)
+    return pairs[:, 0], pairs[:, 1], np.fromiter(edges.values(), dtype=np.float64, count=len(edges))
+
+
+def route_tile(dem: np.ndarray,
+               seed_positions: np.ndarray,
+               seed_levels: np.ndarray,
+               seed_order: np.ndarray,
+               seed_directions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stage 3: flood a tile from seeded perimeter cells and derive flow directions.
+
+    Args:
+        dem: Tile elevations, NaN for nodata
+        seed_positions: Perimeter positions of cells that drain out of the tile
+        seed_levels: Their final water levels
+        seed_order: Their distance rank to the outlet, breaking ties on flats
+        seed_directions: Their D8 codes (or OUTLET)
+
+    Returns:
+        (filled elevations as float32, D8 direction codes as int8)
+    """
+    height, width = dem.shape
+    stride = width + 2
+    valid = ~np.isnan(dem)
+
+    visited = _padded(~valid, True).ravel()
+    filled = _padded(dem.astype(np.float64), np.nan).ravel()
+    directions = _padded(np.where(valid, OUTLET, NODATA).astype(np.int8), NODATA).ravel()
+
+    perimeter = _perimeter_flat(height, width)[seed_positions]
+    seeds = (perimeter // width + 1) * stride + perimeter % width + 1
+    visited[seeds] = True
+    filled[seeds] = seed_levels
+    directions[seeds] = seed_directions
+
+    heap = list(zip(seed_levels.tolist(), seed_order.tolist(), seeds.tolist()))
+    ocean = np.flatnonzero(_padded(_ocean_seeds(valid), False))
+    heap.extend((-np.inf, -1, index) for index in ocean.tolist())
+    heapq.heapify(heap)
+
+    visited, filled, directions = visited.tolist(), filled.tolist(), directions.tolist()
+    offsets = [(dr * stride + dc, 7 - k) for k, (dr, dc) in enumerate(D8_OFFSETS)]
+    heappop, heappush = heapq.heappop, heapq.heappush
+
+    while heap:
+        level, order, cell = heappop(heap)
+        for offset, back in offsets:
+            neighbor = cell + offset
+            if not visited[neighbor]:
+                visited[neighbor] = True
+                directions[neighbor] = back
+                elevation = filled[neighbor]
+                if elevation < level:
+                    elevation = level
+                    filled[neighbor] = level
+                heappush(heap, (elevation, order, neighbor))
+
+    shape = (height + 2, width + 2)
+    filled = np.asarray(filled, dtype=np.float32).reshape(shape)[1:-1, 1:-1]
+    directions = np.asarray(directions, dtype=np.int8).reshape(shape)[1:-1, 1:-1]
+    return filled, directions
+
+
+def descend_tile(filled: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    """
+    Stage 3b: steepest-descent D8 codes on the filled surface.
+
+    The filled surface is exact whatever the tiling, so this makes
+    directions tile-independent everywhere except on flats, where the
+    flooding order still decides.
+
+    Args:
+        filled: Tile filled elevations with a one-cell halo, NaN off the
+            grid and on nodata
+        directions: Flooding directions from route_tile
+
+    Returns:
+        D8 codes; flooding directions are kept on flats and for cells
+        that drain off the grid or into nodata
+    """
+    height, width = directions.shape
+    centre = filled[1:-1, 1:-1].astype(np.float64)
+    steepest = np.zeros((height, width))
+    descent = directions.copy()
+    terminal = directions < 0
+    for code, (dr, dc) in enumerate(D8_OFFSETS):
+        neighbor = filled[1 + dr:1 + dr + height, 1 + dc:1 + dc + width]
+        terminal |= (directions == code) & np.isnan(neighbor)
+        slope = (centre - neighbor) / (np.sqrt(2.0) if dr and dc else 1.0)
+        steeper = slope > steepest  # False for NaN, so first code wins ties
+        steepest[steeper] = slope[steeper]
+        descent[steeper] = code
+    return np.where(terminal, directions, descent)
+
+
+def accumulate(receivers: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Sum weights down a flow forest with vectorized frontier passes.
+
+    Args:
+        receivers: Downstream node of each node, -1 for none
+        weights: Node weights of shape (nodes,) or (nodes, channels)
+
+    Returns:
+        Accumulated weights; nodes on cycles keep partial sums
+    """
+    accumulated = np.array(weights, dtype=np.float64, copy=True)
+    has_receiver = receivers >= 0
+    indegree = np.bincount(receivers[has_receiver], minlength=len(receivers))
+    frontier = np.flatnonzero((indegree == 0) & has_receiver)
+
+    while frontier.size:
+        targets = receivers[frontier]
+        np.add.at(accumulated, targets, accumulated[frontier])
+        np.subtract.at(indegree, targets, 1)
+        targets = np.unique(targets)
+        frontier = targets[(indegree[targets] == 0) & has_receiver[targets]]
+    return accumulated
+
+
+def _tile_receivers(directions: np.ndarray) -> np.ndarray:
+    """Flat in-tile receiver of each cell, -1 where flow leaves the tile or ends"""
+    height, width = directions.shape
+    codes = directions.ravel().astype(np.int64)
+    flows = codes >= 0
+    safe = np.where(flows, codes, 0)
+    rows, cols = np.divmod(np.arange(codes.size), width)
+    target_rows, target_cols = rows + D8_ROWS[safe], cols + D8_COLS[safe]
+    inside = flows & (target_rows >= 0) & (target_rows < height) & (target_cols >= 0) & (target_cols < width)
+    receivers = np.where(inside, target_rows * width + target_cols, -1)
+    into_nodata = inside & (codes[np.where(inside, receivers, 0)] == NODATA)
+    receivers[into_nodata] = -1
+    return receivers
+
+
+def accumulate_tile(directions: np.ndarray,
+                    weights: np.ndarray,
+                    inflow: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stages 4 and 6: accumulate weights within a tile.
+
+    Args:
+        directions: Tile D8 codes
+        weights: Per-cell weights of shape (height, width, channels)
+        inflow: Optional inflow from other tiles per perimeter position,
+            shape (perimeter cells, channels)
+
+    Returns:
+        (accumulation of shape (height, width, channels),
+        accumulation at each perimeter cell,
+        perimeter position where each perimeter cell's flow leaves the
+        tile, or -1 if it ends inside the tile)
+    """
+    height, width, channels = weights.shape
+    receivers = _tile_receivers(directions)
+    perimeter = _perimeter_flat(height, width)
+
+    weights = weights.reshape(-1, channels).astype(np.float64)
+    if inflow is not None:
+        weights[perimeter] += inflow
+    accumulated = accumulate(receivers, weights)
+
+    # Follow each cell to the last in-tile cell on its path by pointer jumping
+    last = np.where(receivers >= 0, receivers, np.arange(receivers.size))
+    for _ in range(int(np.ceil(np.log2(max(2, receivers.size)))) + 1):
+        jumped = last[last]
+        if np.array_equal(jumped, last):
+            break
+        last = jumped
+    exits = last[perimeter]
+    exit_positions = np.searchsorted(perimeter, exits)
+    exit_positions = np.where(
+        (exit_positions < perimeter.size) & (perimeter[np.minimum(exit_positions, perimeter.size - 1)] == exits),
+        exit_positions, -1)
+
+    return accumulated.reshape(height, width, channels), accumulated[perimeter], exit_positions
+
+
+def _call(args):
+    fn, fn_args = args
+    return fn(*fn_args)
+
+
+class HydrologyEngine:
+    """
+    Tiled depression filling, flow routing and runoff accumulation.
+
+    route() returns filled elevations, D8 flow directions, upstream cell
+    counts, accumulated runoff and an effective rainfall that adds routed
+    runoff to local rain for use in the flood risk formula.
+    """
+
+    def __init__(self,
+                 tile_size: int = 1024,
+                 workers: Optional[int] = None,
+                 runoff_coefficient: float = 0.5,
+                 routing_weight: float = 0.5,
+                 nodata: Optional[float] = None):
+        """
+        Args:
+            tile_size: Tile edge in cells
+            workers: Worker processes for tile stages (default: all cores)
+            runoff_coefficient: Fraction of rainfall that becomes runoff
+            routing_weight: Weight of routed upstream runoff in the
+                effective rainfall
+            nodata: DEM value marking missing cells (NaN is always nodata)
+        """
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        self.runoff_coefficient = runoff_coefficient
+        self.routing_weight = routing_weight
+        self.nodata = nodata
+
+    @staticmethod
+    def load_grid(grid) -> np.ndarray:
+        """Array as given, or a .npy file opened memory-mapped"""
+        if isinstance(grid, (str, os.PathLike)):
+            return np.load(grid, mmap_mode="r")
+        return np.asarray(grid)
+
+    def _tiles(self, shape: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+        """(row, col, height, width) of each tile in row-major order"""
+        step = self.tile_size
+        return [(row, col, min(step, shape[0] - row), min(step, shape[1] - col))
+                for row in range(0, shape[0], step) for col in range(0, shape[1], step)]
+
+    def _read_dem(self, dem: np.ndarray, tile: Tuple[int, int, int, int]) -> np.ndarray:
+        row, col, height, width = tile
+        values = np.array(dem[row:row + height, col:col + width], dtype=np.float64)
+        if self.nodata is not None:
+            values[values == self.nodata] = np.nan
+        return values
+
+    def _run(self, fn: Callable, tasks: Iterator[tuple], on_result: Callable):
+        """Run fn over tasks with at most 2 * workers tiles in flight"""
+        if self.workers == 1:
+            for key, fn_args in tasks:
+                on_result(key, fn(*fn_args))
+            return
+
+        with ProcessPoolExecutor(self.workers) as pool:
+            in_flight = deque()
+            for key, fn_args in tasks:
+                in_flight.append((key, pool.submit(_call, (fn, fn_args))))
+                if len(in_flight) >= 2 * self.workers:
+                    key, future = in_flight.popleft()
+                    on_result(key, future.result())
+            while in_flight:
+                key, future = in_flight.popleft()
+                on_result(key, future.result())
+
+    def _allocate(self, out_dir: Optional[str], name: str, shape, dtype) -> np.ndarray:
+        if out_dir is None:
+            return np.empty(shape, dtype=dtype)
+        os.makedirs(out_dir, exist_ok=True)
+        return np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+
+    def route(self, dem, rainfall_24h, out_dir: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Fill, route and accumulate rainfall over a DEM.
+
+        Args:
+            dem: Elevation grid (m), or path to a .npy file
+            rainfall_24h: Rainfall (mm) as a scalar, a grid of the same
+                shape, or path to a .npy file
+            out_dir: Write outputs as memory-mapped .npy files here instead
+                of holding them in memory
+
+        Returns:
+            Dictionary of grids: "filled_elevation", "flow_direction" (D8
+            code, OUTLET or NODATA), "upstream_cells", "upstream_runoff_mm"
+            (mean runoff depth over the contributing area) and
+            "effective_rainfall" (mm)
+        """
+        started = time.perf_counter()
+        dem = self.load_grid(dem)
+        rainfall = self.load_grid(rainfall_24h) if not np.isscalar(rainfall_24h) else rainfall_24h
+        shape = dem.shape
+        tiles = self._tiles(shape)
+
+        # Perimeter bookkeeping: global label = offset + position + 1, label 0 is the outlet
+        perimeters = [_perimeter_flat(height, width) for _, _, height, width in tiles]
+        offsets = np.concatenate([[0], np.cumsum([p.size for p in perimeters])])
+        label_rows = np.concatenate([row + p // width for (row, _, _, width), p in zip(tiles, perimeters)])
+        label_cols = np.concatenate([col + p % width for (_, col, _, width), p in zip(tiles, perimeters)])
+        label_tiles = np.repeat(np.arange(len(tiles)), [p.size for p in perimeters])
+        n_labels = offsets[-1] + 1
+
+        # Stage 1: per-tile spill edges
+        edge_parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+
+        def on_labels(index, edges):
+            label_a, label_b, spill = edges
+            to_global = lambda labels: np.where(labels == OCEAN_LABEL, 0, offsets[index] + labels)
+            edge_parts.append((to_global(label_a), to_global(label_b), spill))
+
+        self._run(label_tile, ((i, (self._read_dem(dem, tile),)) for i, tile in enumerate(tiles)), on_labels)
+        elevations = np.array(dem[label_rows, label_cols], dtype=np.float64)
+        if self.nodata is not None:
+            elevations[elevations == self.nodata] = np.nan
+        cross_edges, exterior_outlet = self._cross_tile_edges(dem, offsets, label_rows, label_cols, elevations)
+        edge_parts.append(cross_edges)
+
+        # Stage 2: water level of every perimeter cell from the spill graph
+        levels, predecessors, order = self._solve_spill_graph(edge_parts, n_labels)
+
+        labels = np.arange(1, n_labels)
+        parent = predecessors[labels]
+        crosses = (parent > 0) & (label_tiles[np.maximum(parent, 1) - 1] != label_tiles)
+        seeded = ~np.isnan(elevations) & (crosses | ((parent == 0) & (exterior_outlet != NODATA)))
+        seed_levels = np.fmax(elevations, levels[labels])
+        seed_directions = exterior_outlet.copy()
+        if crosses.any():
+            target = parent[crosses] - 1
+            seed_directions[crosses] = self._direction_codes(label_rows[target] - label_rows[crosses],
+                                                             label_cols[target] - label_cols[crosses])
+
+        # Stage 3: filled elevations and flow directions
+        filled = self._allocate(out_dir, "filled_elevation", shape, np.float32)
+        directions = self._allocate(out_dir, "flow_direction", shape, np.int8)
+
+        def route_tasks():
+            for index, tile in enumerate(tiles):
+                span = slice(offsets[index], offsets[index + 1])
+                positions = np.flatnonzero(seeded[span])
+                yield index, (self._read_dem(dem, tile), positions, seed_levels[span][positions],
+                              order[labels[span][positions]], seed_directions[span][positions])
+
+        def on_routed(index, result):
+            row, col, height, width = tiles[index]
+            filled[row:row + height, col:col + width], directions[row:row + height, col:col + width] = result
+
+        self._run(route_tile, route_tasks(), on_routed)
+
+        # Stage 3b: steepest descent on the filled surface, reading a halo from neighbouring tiles
+        def direction_tile(tile):
+            row, col, height, width = tile
+            return np.array(directions[row:row + height, col:col + width])
+
+        def halo_tile(tile):
+            row, col, height, width = tile
+            halo = np.full((height + 2, width + 2), np.nan, dtype=np.float32)
+            top, left = max(0, row - 1), max(0, col - 1)
+            bottom, right = min(shape[0], row + height + 1), min(shape[1], col + width + 1)
+            halo[top - row + 1:bottom - row + 1, left - col + 1:right - col + 1] = filled[top:bottom, left:right]
+            return halo
+
+        def on_descended(index, result):
+            row, col, height, width = tiles[index]
+            directions[row:row + height, col:col + width] = result
+
+        self._run(descend_tile, ((i, (halo_tile(tile), direction_tile(tile))) for i, tile in enumerate(tiles)),
+                  on_descended)
+
+        # Stage 4: local accumulation of (runoff mm, cell count) and exit cells
+        def weight_tile(tile):
+            row, col, height, width = tile
+            valid = directions[row:row + height, col:col + width] != NODATA
+            rain = rainfall if np.isscalar(rainfall) else np.asarray(rainfall[row:row + height, col:col + width])
+            runoff = np.where(valid, rain * self.runoff_coefficient, 0.0)
+            return np.stack([runoff, valid.astype(np.float64)], axis=-1)
+
+        perimeter_flow = np.zeros((n_labels, 2))
+        exit_labels = np.full(n_labels, -1, dtype=np.int64)
+
+        def on_local(index, result):
+            _, perimeter_accumulation, exit_positions = result
+            span = slice(offsets[index] + 1, offsets[index + 1] + 1)
+            perimeter_flow[span] = perimeter_accumulation
+            exit_labels[span] = np.where(exit_positions >= 0, offsets[index] + exit_positions + 1, -1)
+
+        self._run(accumulate_tile,
+                  ((i, (direction_tile(tile), weight_tile(tile))) for i, tile in enumerate(tiles)), on_local)
+
+        # Stage 5: inflow between tiles on the perimeter graph
+        inflow = self._tile_inflows(directions, offsets, label_rows, label_cols, perimeter_flow, exit_labels)
+
+        # Stage 6: final accumulation with inflows
+        upstream_cells = self._allocate(out_dir, "upstream_cells", shape, np.int32)
+        upstream_runoff = self._allocate(out_dir, "upstream_runoff_mm", shape, np.float32)
+        effective = self._allocate(out_dir, "effective_rainfall", shape, np.float32)
+
+        def on_final(index, result):
+            row, col, height, width = tiles[index]
+            accumulated = result[0]
+            cells = np.maximum(accumulated[..., 1], 1)
+            runoff_mm = accumulated[..., 0] / cells
+            rain = rainfall if np.isscalar(rainfall) else np.asarray(rainfall[row:row + height, col:col + width])
+            window = (slice(row, row + height), slice(col, col + width))
+            upstream_cells[window] = accumulated[..., 1]
+            upstream_runoff[window] = runoff_mm
+            # Routed runoff grows with the log of the contributing area; a lone cell adds nothing
+            effective[window] = rain + self.routing_weight * runoff_mm * np.log10(cells)
+
+        self._run(accumulate_tile,
+                  ((i, (direction_tile(tile), weight_tile(tile), inflow[offsets[i] + 1:offsets[i + 1] + 1]))
+                   for i, tile in enumerate(tiles)), on_final)
+
+        logger.info(f"Routed {shape[0]}x{shape[1]} DEM in {len(tiles)} tiles "
+                    f"in {time.perf_counter() - started:.1f}s")
+        return {
+            "filled_elevation": filled,
+            "flow_direction": directions,
+            "upstream_cells": upstream_cells,
+            "upstream_runoff_mm": upstream_runoff,
+            "effective_rainfall": effective
+        }
+
+    @staticmethod
+    def _direction_codes(d_rows: np.ndarray, d_cols: np.ndarray) -> np.ndarray:
+        """D8 code for unit row/column steps"""
+        lookup = np.full((3, 3), OUTLET, dtype=np.int8)
+        for code, (dr, dc) in enumerate(D8_OFFSETS):
+            lookup[dr + 1, dc + 1] = code
+        return lookup[d_rows + 1, d_cols + 1]
+
+    def _label_of(self, rows: np.ndarray, cols: np.ndarray, shape, label_offsets) -> np.ndarray:
+        """Global perimeter label of cells known to lie on a tile perimeter"""
+        step = self.tile_size
+        tile_rows, tile_cols = rows // step, cols // step
+        n_tile_cols = -(-shape[1] // step)
+        heights = np.minimum(step, shape[0] - tile_rows * step)
+        widths = np.minimum(step, shape[1] - tile_cols * step)
+        local_rows, local_cols = rows - tile_rows * step, cols - tile_cols * step
+
+        positions = np.empty(rows.size, dtype=np.int64)
+        for height in np.unique(heights):
+            for width in np.unique(widths):
+                group = (heights == height) & (widths == width)
+                if group.any():
+                    positions[group] = _perimeter_position(local_rows[group], local_cols[group], height, width)
+        return label_offsets[tile_rows * n_tile_cols + tile_cols] + positions + 1
+
+    def _cross_tile_edges(self, dem, offsets, label_rows, label_cols, elevations):
+        """
+        Spill edges between perimeter cells of neighbouring tiles and to outlets outside each tile.
+
+        Returns:
+            ((label_a, label_b, spill), exterior_outlet) where exterior_outlet
+            is, per perimeter cell, OUTLET on the grid edge, the D8 code of an
+            adjacent nodata cell in another tile, or NODATA if neither
+        """
+        shape = dem.shape
+        labels = np.arange(1, offsets[-1] + 1)
+        valid = ~np.isnan(elevations)
+        exterior_outlet = np.full(labels.size, NODATA, dtype=np.int8)
+
+        tile_rows, tile_cols = label_rows // self.tile_size, label_cols // self.tile_size
+        parts_a, parts_b, parts_spill = [], [], []
+        for code, (dr, dc) in enumerate(D8_OFFSETS):
+            rows, cols = label_rows + dr, label_cols + dc
+            off_grid = (rows < 0) | (rows >= shape[0]) | (cols < 0) | (cols >= shape[1])
+            other_tile = ~off_grid & ((rows // self.tile_size != tile_rows) | (cols // self.tile_size != tile_cols))
+
+            edge = valid & off_grid
+            exterior_outlet[edge] = OUTLET
+            parts_a.append(labels[edge])
+            parts_b.append(np.zeros(edge.sum(), dtype=np.int64))
+            parts_spill.append(elevations[edge])
+
+            candidates = np.flatnonzero(valid & other_tile)
+            if not candidates.size:
+                continue
+            neighbor = np.array(dem[rows[candidates], cols[candidates]], dtype=np.float64)
+            if self.nodata is not None:
+                neighbor[neighbor == self.nodata] = np.nan
+            missing = np.isnan(neighbor)
+            exterior_outlet[candidates[missing & (exterior_outlet[candidates] == NODATA)]] = code
+            neighbor_labels = self._label_of(rows[candidates], cols[candidates], shape, offsets)
+            parts_a.append(labels[candidates])
+            parts_b.append(np.where(missing, 0, neighbor_labels))
+            parts_spill.append(np.fmax(elevations[candidates], np.where(missing, -np.inf, neighbor)))
+
+        return (np.concatenate(parts_a), np.concatenate(parts_b), np.concatenate(parts_spill)), exterior_outlet
+
+    @staticmethod
+    def _solve_spill_graph(edge_parts, n_labels: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Minimax water level of every label from the outlet label 0.
+
+        Returns:
+            (level per label, predecessor label towards the outlet (-1 for
+            the outlet and unreachable labels), breadth-first rank used to
+            break ties on flats)
+        """
+        label_a = np.concatenate([part[0] for part in edge_parts])
+        label_b = np.concatenate([part[1] for part in edge_parts])
+        spill = np.concatenate([part[2] for part in edge_parts])
+        low, high = np.minimum(label_a, label_b), np.maximum(label_a, label_b)
+
+        # Keep the lowest spill per label pair
+        ordered = np.lexsort((spill, high, low))
+        low, high, spill = low[ordered], high[ordered], spill[ordered]
+        first = np.ones(low.size, dtype=bool)
+        first[1:] = (low[1:] != low[:-1]) | (high[1:] != high[:-1])
+        low, high, spill = low[first], high[first], spill[first]
+
+        # MST on spill ranks (positive, unique) preserves minimax paths
+        ranks = np.empty(spill.size, dtype=np.float64)
+        by_spill = np.argsort(spill, kind="stable")
+        ranks[by_spill] = np.arange(1, spill.size + 1)
+        tree = minimum_spanning_tree(coo_matrix((ranks, (low, high)), shape=(n_labels, n_labels)).tocsr())
+        tree = (tree + tree.T).tocsr()
+        bfs, predecessors = breadth_first_order(tree, 0, directed=False, return_predecessors=True)
+        predecessors = np.where(predecessors < 0, -1, predecessors).astype(np.int64)
+
+        order = np.full(n_labels, n_labels, dtype=np.int64)
+        order[bfs] = np.arange(bfs.size)
+
+        # Level: highest spill on the tree path to the outlet, by pointer jumping
+        reached = predecessors >= 0
+        level = np.full(n_labels, -np.inf)
+        if reached.any():
+            edge_ranks = np.asarray(tree[np.flatnonzero(reached), predecessors[reached]]).ravel()
+            level[reached] = spill[by_spill][edge_ranks.astype(np.int64) - 1]
+        parent = np.where(reached, predecessors, np.arange(n_labels))
+        while True:
+            level = np.fmax(level, level[parent])
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+        return level, predecessors, order
+
+    def _tile_inflows(self, directions, offsets, label_rows, label_cols,
+                      perimeter_flow: np.ndarray, exit_labels: np.ndarray) -> np.ndarray:
+        """Flow entering each perimeter cell from other tiles"""
+        shape = directions.shape
+        n_labels = perimeter_flow.shape[0]
+
+        # Cells whose flow leaves their tile, and the perimeter cell it enters
+        codes = np.asarray(directions[label_rows, label_cols]).astype(np.int64)
+        labels = np.arange(1, n_labels)
+        leaves = (exit_labels[labels] == labels) & (codes >= 0)
+        target_rows = label_rows + D8_ROWS[np.maximum(codes, 0)]
+        target_cols = label_cols + D8_COLS[np.maximum(codes, 0)]
+        leaves &= (target_rows >= 0) & (target_rows < shape[0]) & (target_cols >= 0) & (target_cols < shape[1])
+        receiving = np.full(n_labels, -1, dtype=np.int64)
+        if leaves.any():
+            targets = self._label_of(target_rows[leaves], target_cols[leaves], shape, offsets)
+            into_data = np.asarray(directions[target_rows[leaves], target_cols[leaves]]) != NODATA
+            receiving[labels[leaves][into_data]] = targets[into_data]
+
+        # Each exit cell's own accumulation enters its receiver; other tiles' inflows pass through
+        base = np.zeros_like(perimeter_flow)
+        exits = labels[receiving[labels] >= 0]
+        np.add.at(base, receiving[exits], perimeter_flow[exits])
+        downstream = np.where(exit_labels >= 0, receiving[np.maximum(exit_labels, 0)], -1)
+        downstream[0] = -1
+        return accumulate(downstream, base)
+
+
+def main():
+    """Benchmark: route rain over a synthetic 2,000 x 2,000 DEM"""
+    print("🏞️ EcoSentinel AI - Priority-Flood Hydrological Routing")
+    print("=" * 50)
+
+    rng = np.random.default_rng(5)
+    size = 2000
+    rows, cols = np.mgrid[0:size, 0:size] / size
+    # A valley draining south-east with noise-induced pits
+    dem = 1500 - 600 * rows - 300 * cols + 200 * np.abs(cols - 0.5 - 0.1 * np.sin(6 * rows))
+    dem += ndimage.gaussian_filter(rng.normal(0, 40, (size, size)), 3)
+
+    engine = HydrologyEngine(tile_size=500, workers=os.cpu_count())
+    start = time.perf_counter()
+    result = engine.route(dem, rainfall_24h=60.0)
+    elapsed = time.perf_counter() - start
+
+    filled_depth = result["filled_elevation"] - dem
+    print(f"Routed {dem.size:,} cells in {elapsed:.1f}s")
+    print(f"   Cells in filled depressions: {(filled_depth > 1e-3).sum():,}")
+    print(f"   Largest catchment: {result['upstream_cells'].max():,} cells")
+    print(f"   Effective rainfall: median {np.median(result['effective_rainfall']):.0f} mm, "
+          f"max {result['effective_rainfall'].max():.0f} mm")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Tiled NDVI Change Detection
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Measures vegetation loss between two co-registered multispectral mosaics
+(e.g. Sentinel-2 composites from two dates) around a point of interest.
+Red and NIR bands are read through windowed reads, one tile at a time,
+NDVI differences are reduced to per-tile counts in worker processes, and
+only those counts are aggregated, so memory stays bounded on
+country-scale mosaics.
+"""
+
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import rasterio
+    from rasterio.warp import transform_bounds
+    from rasterio.windows import Window, from_bounds
+except ImportError:  # rasterio is only needed when an engine is configured
+    rasterio = None
+
+logger = logging.getLogger(__name__)
+
+# Per-process dataset handles opened by the pool initializer
+_datasets: Dict[str, object] = {}
+
+
+def ndvi(red: np.ndarray, nir: np.ndarray) -> np.ndarray:
+    """Normalized difference vegetation index, NaN where undefined or either band is NaN"""
+    red = red.astype(np.float32)
+    nir = nir.astype(np.float32)
+    total = nir + red
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, (nir - red) / total, np.nan).astype(np.float32)
+
+
+def ndvi_change_stats(red_before: np.ndarray, nir_before: np.ndarray,
+                      red_after: np.ndarray, nir_after: np.ndarray,
+                      vegetation_threshold: float = 0.3,
+                      loss_threshold: float = 0.2) -> Tuple[int, int, int, float]:
+    """
+    Reduce one tile to vegetation change counts.
+
+    Returns:
+        (valid pixels, vegetated pixels before, pixels with vegetation loss,
+        sum of NDVI change over valid pixels)
+    """
+    before = ndvi(red_before, nir_before)
+    after = ndvi(red_after, nir_after)
+    valid = ~(np.isnan(before) | np.isnan(after))
+    change = np.where(valid, after - before, 0.0)
+    vegetated = valid & (before >= vegetation_threshold)
+    lost = vegetated & (change <= -loss_threshold)
+    return int(valid.sum()), int(vegetated.sum()), int(lost.sum()), float(change.sum())
+
+
+def _open_datasets(before_path: str, after_path: str):
+    if _datasets.get("paths") == (before_path, after_path):
+        return
+    _datasets["paths"] = (before_path, after_path)
+    _datasets["before"] = rasterio.open(before_path)
+    _datasets["after"] = rasterio.open(after_path)
+
+
+def _tile_stats(args) -> Tuple[int, int, int, float]:
+    col_off, row_off, width, height, red_band, nir_band, vegetation_threshold, loss_threshold = args
+    window = Window(col_off, row_off, width, height)
+    before, after = _datasets["before"], _datasets["after"]
+
+    bands = [dataset.read(band, window=window, masked=True)
+             for dataset in (before, after) for band in (red_band, nir_band)]
+    # A pixel masked in any band on either date has no defined change;
+    # NaN keeps it out of the valid count instead of producing NDVI +/-1
+    nodata = np.logical_or.reduce([np.ma.getmaskarray(band) for band in bands])
+    red_before, nir_before, red_after, nir_after = (
+        np.where(nodata, np.nan, np.ma.getdata(band).astype(np.float32)) for band in bands)
+
+    return ndvi_change_stats(red_before, nir_before, red_after, nir_after,
+                             vegetation_threshold, loss_threshold)
+
+
+class NDVIChangeEngine:
+    """
+    Vegetation loss between two dates over an area around a point.
+
+    Both mosaics must share the same grid (CRS, transform and size) and
+    hold red and NIR as bands of the same file.
+    """
+
+    def __init__(self,
+                 before_path: str,
+                 after_path: str,
+                 red_band: int = 1,
+                 nir_band: int = 2,
+                 tile_size: int = 1024,
+                 workers: Optional[int] = None,
+                 vegetation_threshold: float = 0.3,
+                 loss_threshold: float = 0.2):
+        """
+        Args:
+            before_path: Mosaic for the earlier date
+            after_path: Mosaic for the later date
+            red_band: 1-based index of the red band
+            nir_band: 1-based index of the near-infrared band
+            tile_size: Tile edge in pixels (rounded to the file's block size)
+            workers: Worker processes (default: all cores)
+            vegetation_threshold: NDVI above which a pixel counts as vegetated
+            loss_threshold: NDVI drop that counts as vegetation loss
+        """
+        if rasterio is None:
+            raise ImportError("rasterio is required for NDVI change detection: pip install rasterio")
+
+        self.before_path = before_path
+        self.after_path = after_path
+        self.red_band = red_band
+        self.nir_band = nir_band
+        self.workers = workers or os.cpu_count() or 1
+        self.vegetation_threshold = vegetation_threshold
+        self.loss_threshold = loss_threshold
+
+        with rasterio.open(before_path) as before, rasterio.open(after_path) as after:
+            if (before.crs != after.crs or before.transform != after.transform
+                    or before.shape != after.shape):
+                raise ValueError("Before and after mosaics must share the same CRS, transform and shape")
+            self.crs = before.crs
+            self.transform = before.transform
+            self.shape = before.shape
+            # Align tiles to the internal block size so each read touches whole blocks
+            block_height, block_width = before.block_shapes[0]
+            self.tile_size = max(block_width, (tile_size // block_width) * block_width)
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["NDVIChangeEngine"]:
+        """Build an engine from NDVI_BEFORE_PATH / NDVI_AFTER_PATH if both are set"""
+        before_path, after_path = os.getenv('NDVI_BEFORE_PATH'), os.getenv('NDVI_AFTER_PATH')
+        if not (before_path and after_path):
+            return None
+        try:
+            return cls(before_path, after_path,
+                       red_band=int(os.getenv('NDVI_RED_BAND', 1)),
+                       nir_band=int(os.getenv('NDVI_NIR_BAND', 2)))
+        except (ImportError, ValueError, OSError) as e:
+            logger.error(f"Error loading NDVI mosaics: {str(e)}")
+            return None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_open_datasets,
+                                             initargs=(self.before_path, self.after_path))
+        return self._pool
+
+    def window_around(self, latitude: float, longitude: float, area_km2: float) -> Optional["Window"]:
+        """Pixel window of a square of area_km2 centred on the point, clipped to the mosaic"""
+        half_side_km = math.sqrt(area_km2) / 2
+        half_lat = half_side_km / 110.574
+        half_lon = half_side_km / (111.320 * max(0.01, math.cos(math.radians(latitude))))
+        bounds = transform_bounds("EPSG:4326", self.crs,
+                                  longitude - half_lon, latitude - half_lat,
+                                  longitude + half_lon, latitude + half_lat)
+
+        window = from_bounds(*bounds, transform=self.transform).round_offsets().round_lengths()
+        try:
+            return window.intersection(Window(0, 0, self.shape[1], self.shape[0]))
+        except Exception:
+            return None  # Point lies outside the mosaic
+
+    def tiles(self, window: "Window") -> List[Tuple[int, int, int, int]]:
+        """Split a window into (col_off, row_off, width, height) tiles"""
+        col_start, row_start = int(window.col_off), int(window.row_off)
+        col_end, row_end = col_start + int(window.width), row_start + int(window.height)
+        step = self.tile_size
+        return [
+            (col, row, min(step, col_end - col), min(step, row_end - row))
+            for row in range(row_start, row_end, step)
+            for col in range(col_start, col_end, step)
+        ]
+
+    def pixel_area_km2(self, latitude: float) -> float:
+        """Ground area of one pixel"""
+        width, height = abs(self.transform.a), abs(self.transform.e)
+        if self.crs and self.crs.is_geographic:
+            return (width * 111.320 * math.cos(math.radians(latitude))) * (height * 110.574)
+        return width * height / 1e6
+
+    def analyze(self, latitude: float, longitude: float, area_km2: float = 1.0) -> Optional[Dict]:
+        """
+        Vegetation change statistics around a point.
+
+        Returns:
+            Dictionary with vegetation cover, loss fraction, lost area and
+            mean NDVI change, or None if the area is outside the mosaic
+        """
+        window = self.window_around(latitude, longitude, area_km2)
+        if window is None or window.width <= 0 or window.height <= 0:
+            return None
+
+        tasks = [tile + (self.red_band, self.nir_band, self.vegetation_threshold, self.loss_threshold)
+                 for tile in self.tiles(window)]
+        if len(tasks) == 1 or self.workers == 1:
+            _open_datasets(self.before_path, self.after_path)
+            results = [_tile_stats(task) for task in tasks]
+        else:
+            results = list(self._executor().map(_tile_stats, tasks, chunksize=4))
+
+        valid, vegetated, lost, change_sum = (sum(values) for values in zip(*results))
+        if valid == 0:
+            return None
+
+        pixel_area = self.pixel_area_km2(latitude)
+        return {
+            "tiles": len(tasks),
+            "valid_pixels": valid,
+            "vegetation_cover": round(vegetated / valid, 4),
+            "vegetation_loss_fraction": round(lost / vegetated, 4) if vegetated else 0.0,
+            "lost_area_km2": round(lost * pixel_area, 4),
+            "mean_ndvi_change": round(change_sum / valid, 4)
+        }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def main():
+    """Analyze vegetation change around a point in two mosaics"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="NDVI change detection between two mosaics")
+    parser.add_argument("before", help="Mosaic for the earlier date")
+    parser.add_argument("after", help="Mosaic for the later date")
+    parser.add_argument("--lat", type=float, required=True, help="Center latitude")
+    parser.add_argument("--lon", type=float, required=True, help="Center longitude")
+    parser.add_argument("--area", type=float, default=100.0, help="Area in square kilometers")
+    parser.add_argument("--red-band", type=int, default=1, help="Red band index")
+    parser.add_argument("--nir-band", type=int, default=2, help="NIR band index")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args()
+
+    print("🌳 EcoSentinel AI - NDVI Change Detection")
+    print("=" * 50)
+
+    engine = NDVIChangeEngine(args.before, args.after, red_band=args.red_band,
+                              nir_band=args.nir_band, workers=args.workers)
+    try:
+        result = engine.analyze(args.lat, args.lon, args.area)
+    finally:
+        engine.close()
+
+    if result is None:
+        print("❌ Area lies outside the mosaics or has no valid pixels")
+        return
+    for key, value in result.items():
+        print(f"   {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Micro-Batching Prediction Service
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Long-running ASGI service that keeps one warm EcoSentinelPredictor and
+collects concurrent flood risk requests over a short window into a single
+vectorized batch call.
+
+Run with:
+    uvicorn prediction_service:create_app --factory --port 8001
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ecosentinel_predictor import EcoSentinelPredictor, RISK_LEVELS
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ("latitude", "longitude", "rainfall_24h", "elevation")
+
+
+class MicroBatcher:
+    """
+    Collects flood risk requests into batches for predict_flood_risk_batch.
+
+    A batch is dispatched as soon as it holds max_batch_size requests or
+    max_wait_ms has passed since its first request arrived.
+    """
+
+    def __init__(self,
+                 predictor: EcoSentinelPredictor,
+                 max_batch_size: int = 256,
+                 max_wait_ms: float = 5.0):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "largest_batch": 0,
+            "total_queue_wait_ms": 0.0,
+            "total_batch_ms": 0.0
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self):
+        """Start the batching worker on the running event loop"""
+        if self._worker and not self._worker.done():
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Micro-batcher started (max_batch_size={self.max_batch_size}, "
+                    f"max_wait_ms={self.max_wait * 1000:.1f})")
+
+    async def stop(self):
+        """Cancel the batching worker"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, request: Dict) -> Dict:
+        """Queue one flood risk request and wait for its result"""
+        if not self._worker:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future, time.perf_counter()))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[Dict, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            dispatched_at = time.perf_counter()
+            requests_ = [item[0] for item in batch]
+
+            try:
+                # Score off the event loop so new requests keep queueing meanwhile
+                results = await asyncio.to_thread(self._score, requests_)
+            except Exception as e:
+                logger.error(f"Error scoring batch of {len(batch)}: {str(e)}")
+                results = [{"error": "Prediction failed"}] * len(batch)
+
+            for (_, future, queued_at), result in zip(batch, results):
+                self.stats["total_queue_wait_ms"] += (dispatched_at - queued_at) * 1000
+                if not future.done():
+                    future.set_result(result)
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+            self.stats["total_batch_ms"] += (time.perf_counter() - dispatched_at) * 1000
+
+    def _score(self, requests_: List[Dict]) -> List[Dict]:
+        """Score a batch with one vectorized call and build per-request results"""
+        elevation, soil_type = self.predictor.fill_static_features(
+            [r["latitude"] for r in requests_],
+            [r["longitude"] for r in requests_],
+            [r.get("elevation", np.nan) for r in requests_],
+            [r.get("soil_type") for r in requests_]
+        )
+        scores = self.predictor.predict_flood_risk_batch(
+            rainfall_24h=[r["rainfall_24h"] for r in requests_],
+            elevation=elevation,
+            soil_type=soil_type
+        )
+        updated_at = datetime.now().isoformat()
+
+        results = []
+        for request, risk_score, level_code, request_elevation, request_soil in zip(
+                requests_, scores["risk_score"], scores["risk_level_code"], elevation, soil_type):
+            risk_score = float(risk_score)
+            risk_level = RISK_LEVELS[level_code]
+            latitude, longitude = request["latitude"], request["longitude"]
+            results.append({
+                "location": {"latitude": latitude, "longitude": longitude},
+                "risk_score": round(risk_score, 3),
+                "risk_level": risk_level,
+                "confidence": 0.87,
+                "factors": {
+                    "rainfall_24h": request["rainfall_24h"],
+                    "elevation": float(request_elevation),
+                    "soil_type": str(request_soil)
+                },
+                "recommendations": self.predictor._generate_flood_recommendations(risk_score, request["rainfall_24h"]),
+                "updated_at": updated_at,
+                "alert_message": self.predictor._generate_alert_message(risk_level, latitude, longitude)
+            })
+        return results
+
+    def metrics(self) -> Dict:
+        """Queue depth and batching statistics"""
+        batches = max(1, self.stats["batches"])
+        requests_ = max(1, self.stats["requests"])
+        return {
+            "queue_depth": self.queue_depth,
+            "requests": self.stats["requests"],
+            "batches": self.stats["batches"],
+            "largest_batch": self.stats["largest_batch"],
+            "mean_batch_size": round(self.stats["requests"] / batches, 2),
+            "mean_queue_wait_ms": round(self.stats["total_queue_wait_ms"] / requests_, 3),
+            "mean_batch_ms": round(self.stats["total_batch_ms"] / batches, 3),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+
+class PredictionService:
+    """
+    Minimal ASGI application exposing the micro-batched predictor.
+
+    Routes:
+        POST /predict/flood  - one request object, or a list of them
+        POST /observe/air_quality - hourly station AQI readings for the AQI model
+        GET  /metrics        - queue depth and batching statistics
+        GET  /health         - liveness check
+    """
+
+    def __init__(self, predictor: Optional[EcoSentinelPredictor] = None,
+                 max_batch_size: Optional[int] = None,
+                 max_wait_ms: Optional[float] = None):
+        # A predictor built here is closed on shutdown; a caller's is left to the caller
+        self._owns_predictor = predictor is None
+        self.predictor = predictor or EcoSentinelPredictor()
+        self.predictor.load_models()
+        self.batcher = MicroBatcher(
+            self.predictor,
+            max_batch_size=max_batch_size or int(os.getenv('PREDICTION_MAX_BATCH_SIZE', 256)),
+            max_wait_ms=max_wait_ms or float(os.getenv('PREDICTION_MAX_WAIT_MS', 5))
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method, path = scope["method"], scope["path"].rstrip("/")
+        if method == "GET" and path == "/health":
+            await self._respond(send, 200, {"status": "ok", "models_loaded": self.predictor.models_loaded})
+        elif method == "GET" and path == "/metrics":
+            await self._respond(send, 200, self.batcher.metrics())
+        elif method == "POST" and path == "/predict/flood":
+            await self._predict_flood(receive, send)
+        elif method == "POST" and path == "/observe/air_quality":
+            await self._observe_air_quality(receive, send)
+        else:
+            await self._respond(send, 404, {"error": f"No route for {method} {scope['path']}"})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.batcher.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.batcher.stop()
+                if self._owns_predictor:
+                    self.predictor.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _read_json(receive):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        return json.loads(body or b"null")
+
+    async def _predict_flood(self, receive, send):
+        try:
+            payload = await self._read_json(receive)
+        except json.JSONDecodeError:
+            await self._respond(send, 400, {"error": "Request body must be JSON"})
+            return
+
+        items = payload if isinstance(payload, list) else [payload]
+        # Elevation may be omitted when the static feature grid can supply it
+        required = [field for field in REQUIRED_FIELDS
+                    if field != "elevation" or self.batcher.predictor.feature_grid is None]
+        requests_ = []
+        for item in items:
+            request, error = self._validate(item, required)
+            if error:
+                await self._respond(send, 400, {"error": error})
+                return
+            requests_.append(request)
+
+        results = await asyncio.gather(*(self.batcher.submit(request) for request in requests_))
+        await self._respond(send, 200, results if isinstance(payload, list) else results[0])
+
+    async def _observe_air_quality(self, receive, send):
+        """
+        Advance the station AQI model with one hour of readings.
+
+        Body: {"readings": {"<station id>": <AQI>, ...}, "observed_at": <ISO
+        8601 time or UNIX seconds, default now>}
+        """
+        try:
+            payload = await self._read_json(receive)
+        except json.JSONDecodeError:
+            await self._respond(send, 400, {"error": "Request body must be JSON"})
+            return
+        readings = payload.get("readings") if isinstance(payload, dict) else None
+        if not isinstance(readings, dict):
+            await self._respond(send, 400, {"error": "Body must hold a 'readings' object of station id to AQI"})
+            return
+        if self.predictor.aqi_model is None:
+            await self._respond(send, 503, {"error": "No station AQI model is loaded"})
+            return
+
+        values = {}
+        for station_id, value in readings.items():
+            try:
+                values[station_id] = float(value)
+            except (TypeError, ValueError):
+                values[station_id] = np.nan
+            if not np.isfinite(values[station_id]):
+                await self._respond(send, 400, {"error": f"Reading for station '{station_id}' must be a finite number"})
+                return
+
+        observed_at = payload.get("observed_at")
+        try:
+            if isinstance(observed_at, (int, float)):
+                observed_at = datetime.fromtimestamp(observed_at, tz=timezone.utc)
+            elif observed_at is not None:
+                observed_at = datetime.fromisoformat(str(observed_at).replace("Z", "+00:00"))
+        except (TypeError, ValueError, OverflowError, OSError):
+            await self._respond(send, 400, {"error": "Field 'observed_at' must be an ISO 8601 time or UNIX seconds"})
+            return
+
+        matched = self.predictor.observe_air_quality(values, observed_at)
+        await self._respond(send, 200, {"matched": matched, "unknown_stations": len(values) - matched})
+
+    def _validate(self, item, required: List[str]) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Check one request and coerce its numeric fields to floats.
+
+        Done before queueing so a bad request is rejected on its own instead
+        of failing the whole micro-batch it would have joined.
+
+        Returns:
+            (request, None) for a valid request, else (None, error message)
+        """
+        if not isinstance(item, dict):
+            return None, "Each request must be a JSON object"
+        missing = [field for field in required if item.get(field) is None]
+        if missing:
+            return None, f"Missing fields: {', '.join(missing)}"
+
+        request = dict(item)
+        for field in REQUIRED_FIELDS:
+            if request.get(field) is None:
+                request.pop(field, None)
+                continue
+            try:
+                value = float(request[field])
+            except (TypeError, ValueError):
+                value = np.nan
+            if not np.isfinite(value):
+                return None, f"Field '{field}' must be a finite number"
+            request[field] = value
+
+        # Without elevation the grid must cover the point, or the score would be NaN
+        grid = self.batcher.predictor.feature_grid
+        if ("elevation" not in request and grid is not None
+                and grid.lookup(request["latitude"], request["longitude"]) is None):
+            return None, "No elevation data for this location; provide elevation"
+        return request, None
+
+    async def _respond(self, send, status: int, body):
+        data = json.dumps(body).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())]
+        })
+        await send({"type": "http.response.body", "body": data})
+
+
+def create_app() -> PredictionService:
+    """Build the service and its predictor; called by the server, not on import"""
+    return PredictionService()
+
+
+def main():
+    """Run the prediction service with uvicorn"""
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ uvicorn is required to run the prediction service: pip install uvicorn")
+        return
+
+    port = int(os.getenv('PREDICTION_SERVICE_PORT', 8001))
+    print(f"🚀 EcoSentinel AI prediction service on http://localhost:{port}")
+    uvicorn.run(create_app(), host="0.0.0.0", port=port)
+
+
+if __name__ == "__main__":
+    main()
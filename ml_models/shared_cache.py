@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Cross-Process Shared Weather Cache
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+A machine-wide cache of normalized weather records backed by a local
+SQLite database in WAL mode, shared by every Functions worker and batch
+process on the host. Fills are coordinated with a lease row per location
+so that only one process calls upstream for a location per observation
+period while the others wait for its result.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS weather (
+    location_key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS weather_fetched_at ON weather (fetched_at);
+CREATE TABLE IF NOT EXISTS fills (
+    location_key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    started_at REAL NOT NULL
+);
+"""
+
+
+class SharedWeatherCache:
+    """
+    SQLite-backed weather cache with atomic fill-once semantics.
+
+    Each process opens its own connections (one per thread); WAL mode
+    lets readers proceed while another process writes.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 ttl: Optional[float] = None,
+                 lease_timeout: float = 15.0,
+                 max_entries: int = 100000,
+                 retention: float = 86400.0):
+        """
+        Args:
+            path: Database file (default: ECOSENTINEL_SHARED_CACHE or
+                ecosentinel-weather-cache.db in the temp directory)
+            ttl: Seconds a record stays fresh (default: CACHE_WEATHER_DATA_MINUTES)
+            lease_timeout: Seconds after which another process may take over
+                a fill whose owner died
+            max_entries: Maximum number of cached locations
+            retention: Records older than this are evicted
+        """
+        self.path = path or os.getenv('ECOSENTINEL_SHARED_CACHE') or os.path.join(
+            os.getenv('TMPDIR', '/tmp'), 'ecosentinel-weather-cache.db')
+        self.ttl = ttl if ttl is not None else float(os.getenv('CACHE_WEATHER_DATA_MINUTES', 30)) * 60
+        self.lease_timeout = lease_timeout
+        self.max_entries = max_entries
+        self.retention = retention
+        self.owner_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.stats = {"hits": 0, "fills": 0, "waits": 0}
+
+        self._local = threading.local()
+        self._puts = 0
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, location_key: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Return a cached record no older than max_age seconds, or None"""
+        max_age = self.ttl if max_age is None else max_age
+        row = self._connection().execute(
+            "SELECT data, fetched_at FROM weather WHERE location_key = ?", (location_key,)
+        ).fetchone()
+        if row and time.time() - row[1] <= max_age:
+            return json.loads(row[0])
+        return None
+
+    def put(self, location_key: str, data: Dict):
+        """Store a record and release any fill lease on it"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO weather (location_key, data, fetched_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(location_key) DO UPDATE SET data = excluded.data, fetched_at = excluded.fetched_at",
+                (location_key, json.dumps(data), time.time()))
+            conn.execute("DELETE FROM fills WHERE location_key = ?", (location_key,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._puts += 1
+        if self._puts % 500 == 0:
+            self.evict()
+
+    def _try_acquire(self, location_key: str) -> bool:
+        """Take the fill lease for a location unless a live owner holds it"""
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO fills (location_key, owner, started_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(location_key) DO UPDATE SET owner = excluded.owner, started_at = excluded.started_at "
+            "WHERE fills.started_at < ?",
+            (location_key, self.owner_id, now, now - self.lease_timeout))
+        return cursor.rowcount == 1
+
+    def _release(self, location_key: str):
+        self._connection().execute(
+            "DELETE FROM fills WHERE location_key = ? AND owner = ?", (location_key, self.owner_id))
+
+    def get_or_fill(self,
+                    location_key: str,
+                    fill: Callable[[], Optional[Dict]],
+                    max_age: Optional[float] = None,
+                    wait_timeout: Optional[float] = None,
+                    should_store: Callable[[Dict], bool] = lambda data: True) -> Optional[Dict]:
+        """
+        Return a fresh record, calling fill in at most one process at a time.
+
+        Args:
+            location_key: Location identifier
+            fill: Fetches the record upstream when it is missing or stale
+            max_age: Freshness limit in seconds (default: ttl; 0 forces a fill,
+                though concurrent forced fills still share one upstream call)
+            wait_timeout: Longest time to wait on another process's fill
+                before calling fill directly (default: lease_timeout)
+            should_store: Predicate deciding whether a fill result is cached
+
+        Returns:
+            The cached or freshly filled record, or None if fill failed
+        """
+        max_age = self.ttl if max_age is None else max_age
+        requested_at = time.time()
+        wait_timeout = self.lease_timeout if wait_timeout is None else wait_timeout
+
+        if max_age > 0:
+            cached = self.get(location_key, max_age)
+            if cached is not None:
+                self.stats["hits"] += 1
+                return cached
+
+        delay = 0.01
+        while True:
+            if self._try_acquire(location_key):
+                self.stats["fills"] += 1
+                try:
+                    data = fill()
+                    if data is not None and should_store(data):
+                        self.put(location_key, data)
+                    return data
+                finally:
+                    self._release(location_key)
+
+            # Another process is filling: wait for its result
+            self.stats["waits"] += 1
+            if time.time() - requested_at >= wait_timeout:
+                logger.warning(f"Timed out waiting for shared fill of {location_key}, fetching directly")
+                return fill()
+            time.sleep(min(delay, max(0.0, wait_timeout - (time.time() - requested_at))))
+            delay = min(delay * 2, 0.2)
+
+            cached = self.get(location_key, max(max_age, time.time() - requested_at))
+            if cached is not None:
+                self.stats["hits"] += 1
+                return cached
+
+    def evict(self):
+        """Drop expired records and keep at most max_entries locations"""
+        conn = self._connection()
+        conn.execute("DELETE FROM weather WHERE fetched_at < ?", (time.time() - self.retention,))
+        conn.execute(
+            "DELETE FROM weather WHERE location_key IN ("
+            "SELECT location_key FROM weather ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,))
+        conn.execute("DELETE FROM fills WHERE started_at < ?", (time.time() - self.lease_timeout,))
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Static Feature Grid
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Precomputed national grid of per-place attributes that do not change
+between calls: elevation, soil class and slope. The grid is a directory
+of .npy arrays opened memory-mapped, so loading is instant, pages are
+shared between worker processes, and a latitude/longitude lookup is a
+constant-time index into the arrays. Batch lookups are vectorized.
+
+Layout of a grid directory:
+
+    grid.json        bounds, resolution and soil class names
+    elevation.npy    float32 metres, NaN where there is no data
+    soil_class.npy   uint8 index into the soil class names
+    slope.npy        float32 degrees
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Soil class codes; 0 means unmapped
+SOIL_CLASSES = ("unknown", "clay", "loam", "sand")
+DEFAULT_SOIL_TYPE = "loam"
+
+METRES_PER_DEGREE = 111320.0
+METADATA_FILE = "grid.json"
+LAYERS = ("elevation", "soil_class", "slope")
+
+
+def slope_degrees(elevation: np.ndarray, latitudes: np.ndarray, resolution: float) -> np.ndarray:
+    """
+    Terrain slope of a lat/lon elevation block.
+
+    Args:
+        elevation: Elevation rows (m), including one halo row above and below
+            where available
+        latitudes: Latitude of each row
+        resolution: Cell size in degrees
+
+    Returns:
+        Slope in degrees, same shape as elevation
+    """
+    elevation = np.asarray(elevation, dtype=np.float64)
+    if min(elevation.shape) < 2:
+        return np.zeros(elevation.shape, dtype=np.float32)
+    dy = resolution * METRES_PER_DEGREE
+    dx = np.maximum(dy * np.cos(np.radians(latitudes)), 1.0)[:, None]
+    # Rows run north to south, but only the gradient magnitude matters
+    d_row, d_col = np.gradient(elevation)
+    return np.degrees(np.arctan(np.hypot(d_row / dy, d_col / dx))).astype(np.float32)
+
+
+class StaticFeatureGrid:
+    """
+    Memory-mapped elevation, soil class and slope on a regular lat/lon grid.
+
+    Row 0 is the northern edge (max_latitude) and column 0 the western
+    edge (min_longitude), as in north-up rasters.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Grid directory written by StaticFeatureGrid.build
+        """
+        with open(os.path.join(directory, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        self.directory = directory
+        self.max_latitude = float(metadata["max_latitude"])
+        self.min_longitude = float(metadata["min_longitude"])
+        self.resolution = float(metadata["resolution"])
+        self.soil_classes = np.asarray(metadata.get("soil_classes", SOIL_CLASSES))
+
+        self.elevation = np.load(os.path.join(directory, "elevation.npy"), mmap_mode="r")
+        self.soil_class = np.load(os.path.join(directory, "soil_class.npy"), mmap_mode="r")
+        self.slope = np.load(os.path.join(directory, "slope.npy"), mmap_mode="r")
+        if not (self.elevation.shape == self.soil_class.shape == self.slope.shape):
+            raise ValueError(f"Feature grid layers in {directory} have different shapes")
+        self.shape = self.elevation.shape
+
+        # Unknown soil resolves to the default soil type
+        self._soil_names = np.where(self.soil_classes == "unknown", DEFAULT_SOIL_TYPE, self.soil_classes)
+
+    @classmethod
+    def from_env(cls) -> Optional["StaticFeatureGrid"]:
+        """Open the grid at STATIC_FEATURES_DIR, or return None if unset or unreadable"""
+        directory = os.getenv('STATIC_FEATURES_DIR')
+        if not directory:
+            return None
+        try:
+            return cls(directory)
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"Error opening static feature grid: {str(e)}")
+            return None
+
+    @property
+    def min_latitude(self) -> float:
+        return self.max_latitude - self.shape[0] * self.resolution
+
+    @property
+    def max_longitude(self) -> float:
+        return self.min_longitude + self.shape[1] * self.resolution
+
+    def cell(self, latitudes, longitudes):
+        """Grid rows, columns and an inside-the-grid mask for coordinates"""
+        rows = np.floor((self.max_latitude - np.asarray(latitudes, dtype=np.float64)) / self.resolution)
+        cols = np.floor((np.asarray(longitudes, dtype=np.float64) - self.min_longitude) / self.resolution)
+        inside = (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+        return np.where(inside, rows, 0).astype(np.int64), np.where(inside, cols, 0).astype(np.int64), inside
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[Dict]:
+        """
+        Static features of the cell containing a point.
+
+        Returns:
+            Dictionary with "elevation" (m), "soil_type" and "slope"
+            (degrees), or None outside the grid or where there is no data
+        """
+        row = int((self.max_latitude - latitude) // self.resolution)
+        col = int((longitude - self.min_longitude) // self.resolution)
+        if not (0 <= row < self.shape[0] and 0 <= col < self.shape[1]):
+            return None
+        elevation = float(self.elevation[row, col])
+        if not np.isfinite(elevation):
+            return None
+        return {
+            "elevation": elevation,
+            "soil_type": str(self._soil_names[self.soil_class[row, col]]),
+            "slope": round(float(self.slope[row, col]), 2)
+        }
+
+    def lookup_batch(self, latitudes, longitudes) -> Dict[str, np.ndarray]:
+        """
+        Vectorized lookup for many points.
+
+        Returns:
+            Dictionary of arrays: "elevation" (float32, NaN where missing),
+            "soil_type" (names, the default soil where missing), "slope"
+            (float32) and "valid" (bool)
+        """
+        rows, cols, inside = self.cell(latitudes, longitudes)
+        elevation = np.where(inside, self.elevation[rows, cols], np.nan).astype(np.float32)
+        valid = np.isfinite(elevation)
+        soil_class = np.where(valid, self.soil_class[rows, cols], 0)
+        return {
+            "elevation": elevation,
+            "soil_type": self._soil_names[soil_class],
+            "slope": np.where(valid, self.slope[rows, cols], np.nan).astype(np.float32),
+            "valid": valid
+        }
+
+    @classmethod
+    def build(cls,
+              directory: str,
+              elevation,
+              soil_class,
+              max_latitude: float,
+              min_longitude: float,
+              resolution: float,
+              soil_classes: Sequence[str] = SOIL_CLASSES,
+              block_rows: int = 1024) -> "StaticFeatureGrid":
+        """
+        Write a grid directory from elevation and soil class rasters.
+
+        Slope is derived from elevation. Inputs may themselves be memory-mapped;
+        everything is processed in row blocks so the grid never has to fit
+        in memory.
+
+        Args:
+            directory: Output directory
+            elevation: Elevation raster (m), north-up, NaN for no data
+            soil_class: Raster of indices into soil_classes (ValueError if
+                any code is out of range)
+            max_latitude: Latitude of the northern edge
+            min_longitude: Longitude of the western edge
+            resolution: Cell size in degrees
+            soil_classes: Soil class names by code
+            block_rows: Rows processed at a time
+
+        Returns:
+            The opened grid
+        """
+        if np.shape(elevation) != np.shape(soil_class):
+            raise ValueError("Elevation and soil class rasters must have the same shape")
+        if not 0 < len(soil_classes) <= 256:
+            raise ValueError("Between 1 and 256 soil classes are required")
+        os.makedirs(directory, exist_ok=True)
+        n_rows, n_cols = np.shape(elevation)
+        outputs = {
+            "elevation": np.lib.format.open_memmap(os.path.join(directory, "elevation.npy"), mode="w+",
+                                                   dtype=np.float32, shape=(n_rows, n_cols)),
+            "soil_class": np.lib.format.open_memmap(os.path.join(directory, "soil_class.npy"), mode="w+",
+                                                    dtype=np.uint8, shape=(n_rows, n_cols)),
+            "slope": np.lib.format.open_memmap(os.path.join(directory, "slope.npy"), mode="w+",
+                                               dtype=np.float32, shape=(n_rows, n_cols))
+        }
+        row_latitudes = max_latitude - (np.arange(n_rows) + 0.5) * resolution
+
+        for start in range(0, n_rows, block_rows):
+            stop = min(start + block_rows, n_rows)
+            # One halo row on each side keeps slopes continuous across blocks
+            lo, hi = max(0, start - 1), min(n_rows, stop + 1)
+            block = np.asarray(elevation[lo:hi], dtype=np.float32)
+            slope = slope_degrees(block, row_latitudes[lo:hi], resolution)[start - lo:start - lo + stop - start]
+            outputs["elevation"][start:stop] = block[start - lo:start - lo + stop - start]
+            codes = np.asarray(soil_class[start:stop])
+            if codes.size and (codes.min() < 0 or codes.max() >= len(soil_classes)):
+                raise ValueError(f"Soil class codes in rows {start}-{stop - 1} must be between 0 and "
+                                 f"{len(soil_classes) - 1}")
+            outputs["soil_class"][start:stop] = codes
+            outputs["slope"][start:stop] = slope
+
+        for array in outputs.values():
+            array.flush()
+        with open(os.path.join(directory, METADATA_FILE), "w") as f:
+            json.dump({
+                "max_latitude": max_latitude,
+                "min_longitude": min_longitude,
+                "resolution": resolution,
+                "shape": [n_rows, n_cols],
+                "soil_classes": list(soil_classes)
+            }, f, indent=2)
+        logger.info(f"Wrote {n_rows}x{n_cols} static feature grid to {directory}")
+        return cls(directory)
+
+
+def main():
+    """Benchmark: build a synthetic Kenya grid and look up 1,000,000 points"""
+    print("🗺️ EcoSentinel AI - Static Feature Grid")
+    print("=" * 50)
+
+    import tempfile
+
+    rng = np.random.default_rng(9)
+    resolution = 0.01
+    max_latitude, min_longitude = 5.0, 33.9
+    n_rows, n_cols = 970, 800
+    lat = max_latitude - (np.arange(n_rows) + 0.5) * resolution
+    lon = min_longitude + (np.arange(n_cols) + 0.5) * resolution
+    elevation = (1500 * np.exp(-((lat[:, None] + 0.5) ** 2 + (lon[None, :] - 37.0) ** 2) / 8)
+                 + rng.normal(0, 20, (n_rows, n_cols))).astype(np.float32)
+    elevation[:, -40:] = np.nan  # Offshore
+    soil_class = rng.integers(0, len(SOIL_CLASSES), (n_rows, n_cols), dtype=np.uint8)
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        grid = StaticFeatureGrid.build(directory, elevation, soil_class, max_latitude, min_longitude, resolution)
+        print(f"Built {n_rows}x{n_cols} grid in {time.perf_counter() - start:.2f}s")
+
+        print(f"Nairobi: {grid.lookup(-1.2921, 36.8219)}")
+
+        points = 1000000
+        start = time.perf_counter()
+        features = grid.lookup_batch(rng.uniform(-4.7, 5.0, points), rng.uniform(33.9, 41.9, points))
+        elapsed = time.perf_counter() - start
+        print(f"Looked up {points:,} points in {elapsed * 1000:.0f}ms "
+              f"({features['valid'].mean():.1%} with data)")
+
+
+if __name__ == "__main__":
+    main()
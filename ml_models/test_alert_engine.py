@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the flood alert change-detection engine
+"""
+
+from alert_engine import FloodAlertEngine
+
+
+def test_first_scan_alerts_only_above_low():
+    engine = FloodAlertEngine()
+    transitions = engine.update(["a", "b", "c"], [0.1, 0.5, 0.9], now=0)
+
+    assert [(t["location_id"], t["previous_level"], t["risk_level"]) for t in transitions] == [
+        ("b", None, "MEDIUM"), ("c", None, "HIGH")]
+    assert engine.current_levels() == {"a": "LOW", "b": "MEDIUM", "c": "HIGH"}
+
+
+def test_scores_inside_hysteresis_band_do_not_flap():
+    engine = FloodAlertEngine(thresholds=(0.4, 0.7), hysteresis=0.05, cooldown_seconds=0)
+    engine.update(["a"], [0.3], now=0)
+
+    # Crossing the raw threshold is not enough to escalate
+    assert engine.update(["a"], [0.43], now=1) == []
+    assert engine.current_levels()["a"] == "LOW"
+
+    escalation = engine.update(["a"], [0.46], now=2)
+    assert [t["risk_level"] for t in escalation] == ["MEDIUM"]
+
+    # Falling back below the raw threshold but inside the band keeps MEDIUM
+    assert engine.update(["a"], [0.37], now=3) == []
+    assert engine.current_levels()["a"] == "MEDIUM"
+
+    deescalation = engine.update(["a"], [0.34], now=4)
+    assert [(t["previous_level"], t["risk_level"]) for t in deescalation] == [("MEDIUM", "LOW")]
+
+
+def test_escalation_ignores_cooldown():
+    engine = FloodAlertEngine(cooldown_seconds=3600)
+    engine.update(["a"], [0.5], now=0)
+
+    transitions = engine.update(["a"], [0.9], now=10)
+    assert [(t["previous_level"], t["risk_level"]) for t in transitions] == [("MEDIUM", "HIGH")]
+
+
+def test_deescalation_waits_for_cooldown():
+    engine = FloodAlertEngine(cooldown_seconds=3600)
+    engine.update(["a"], [0.9], now=0)
+
+    assert engine.update(["a"], [0.1], now=600) == []
+    assert engine.current_levels()["a"] == "HIGH"
+
+    transitions = engine.update(["a"], [0.1], now=3600)
+    assert [(t["previous_level"], t["risk_level"]) for t in transitions] == [("HIGH", "LOW")]
+    assert engine.current_levels()["a"] == "LOW"
+
+
+def test_state_survives_save_and_load(tmp_path):
+    engine = FloodAlertEngine()
+    engine.update(["a", "b"], [0.9, 0.1], now=0)
+    path = str(tmp_path / "alerts.npz")
+    engine.save(path)
+
+    restored = FloodAlertEngine()
+    restored.load(path)
+    assert restored.current_levels() == {"a": "HIGH", "b": "LOW"}
+    assert restored.update(["a", "b"], [0.9, 0.1], now=10) == []
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched AQI forecaster
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from aqi_forecaster import MAX_CATCH_UP_HOURS, MAX_LAG, AQIForecaster
+
+END = datetime(2025, 6, 1, 12)
+
+
+def fitted_model(n_stations: int = 20) -> AQIForecaster:
+    rng = np.random.default_rng(7)
+    hours = np.arange(24 * 30)
+    base = rng.uniform(30, 120, (n_stations, 1))
+    peak = rng.uniform(0, 24, (n_stations, 1))
+    history = base + 20 * np.cos(2 * np.pi * (hours - peak) / 24) + rng.normal(0, 5, (n_stations, len(hours)))
+    return AQIForecaster().fit(history, end=END, station_ids=[f"KE-{i}" for i in range(n_stations)])
+
+
+def test_long_gaps_fall_back_to_climatology():
+    model = fitted_model()
+    start = END + timedelta(hours=MAX_CATCH_UP_HOURS)
+    stepped = model.forecast(25, start=start)
+    climatology = model.forecast(24, start=start + timedelta(hours=1))
+
+    # Stepping through a week has converged to the diurnal climatology
+    np.testing.assert_allclose(stepped[:, 1:], climatology, atol=0.1)
+    np.testing.assert_allclose(model.forecast(24, start=END + timedelta(days=365)),
+                               model.climatology()[:, (np.arange(24) + END.hour) % 24], atol=1e-3)
+
+
+def test_observe_after_long_gap_keeps_finite_state():
+    model = fitted_model()
+    readings = np.full(len(model), 80.0)
+    model.observe(readings, END + timedelta(days=30))
+
+    assert model.last_hour - fitted_model().last_hour == 24 * 30
+    assert np.isfinite(model.state).all()
+    assert (model.state[:, -1] == 80.0).all()
+
+
+def test_forecast_starts_at_requested_hour_before_last_observation():
+    model = fitted_model()
+    ahead = model.forecast(6)
+    overlapping = model.forecast(9, start=END - timedelta(hours=2))
+
+    # The first three hours are the observed state, the rest the usual forecast
+    np.testing.assert_array_equal(overlapping[:, :3], model.state[:, -3:])
+    np.testing.assert_array_equal(overlapping[:, 3:], ahead)
+    np.testing.assert_array_equal(model.forecast(2, start=END - timedelta(hours=5)), model.state[:, -6:-4])
+    with pytest.raises(ValueError):
+        model.forecast(24, start=END - timedelta(hours=MAX_LAG))
+
+
+def test_observe_stations_maps_readings_by_id():
+    model = fitted_model(3)
+    predicted = model.forecast(1)[:, 0]
+
+    assert model.observe_stations({"KE-2": 150.0, "KE-7": 90.0}, END + timedelta(hours=1)) == 1
+    assert model.state[2, -1] == 150.0
+    np.testing.assert_allclose(model.state[:2, -1], predicted[:2])
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-hazard assessment
+"""
+
+import pytest
+
+import ecosentinel_predictor
+from ecosentinel_predictor import EcoSentinelPredictor
+
+
+def test_malformed_request_does_not_fail_the_batch():
+    predictor = EcoSentinelPredictor()
+    results = predictor.assess_all_batch([
+        {"latitude": "abc", "longitude": 36.8},
+        {"latitude": -1.29, "longitude": 36.82, "rainfall_24h": 80, "elevation": 100},
+        {"latitude": -1.0, "longitude": 36.0, "rainfall_24h": "heavy"}
+    ], hazards=("flood",))
+
+    assert results[0]["error"].startswith("Invalid request")
+    assert results[1]["flood"]["risk_level"] == "HIGH"
+    assert results[2]["error"].startswith("Invalid request")
+
+
+def test_failed_flood_model_is_reported_per_hazard(monkeypatch):
+    predictor = EcoSentinelPredictor()
+
+    def broken(contexts):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(predictor, "_assess_flood", broken)
+    result = predictor.assess_all(latitude=-1.29, longitude=36.82, rainfall_24h=10, elevation=1500,
+                                  hazards=("flood", "air_quality"))
+
+    assert result["flood"] == {"error": "Assessment unavailable"}
+    assert "average_aqi" in result["air_quality"]
+    assert result["inputs"]["flood"] == "unavailable"
+
+
+def test_close_stops_the_assessment_threads():
+    predictor = EcoSentinelPredictor()
+    predictor.assess_all(latitude=-1.29, longitude=36.82, rainfall_24h=10, elevation=1500, hazards=("flood",))
+    threads = list(predictor._assessment_executor._threads)
+    predictor.close()
+
+    assert threads and not any(thread.is_alive() for thread in threads)
+    with pytest.raises(RuntimeError):
+        predictor.assess_all(latitude=-1.29, longitude=36.82, rainfall_24h=10, elevation=1500, hazards=("flood",))
+
+
+def test_unhealthy_threshold_sets_the_air_quality_band(monkeypatch):
+    predictor = EcoSentinelPredictor()
+    monkeypatch.setattr(ecosentinel_predictor, "AQI_UNHEALTHY_THRESHOLD", 0.0)
+    assert predictor.assess_all(latitude=-1.29, longitude=36.82, hazards=("air_quality",))["air_quality"][
+        "risk_level"] == "HIGH"
+
+    monkeypatch.setattr(ecosentinel_predictor, "AQI_UNHEALTHY_THRESHOLD", 1e9)
+    assert predictor.assess_all(latitude=-1.29, longitude=36.82, hazards=("air_quality",))["air_quality"][
+        "risk_level"] in ("LOW", "MEDIUM")
+    predictor.close()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for historical backtesting
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import AQIBacktest, FloodBacktest, SkillTable, synthetic_flood_archive
+
+
+def test_skill_scores_match_hand_computed_values():
+    table = SkillTable()
+    table.add(["Nairobi"] * 5, [24] * 5, [0.9, 0.8, 0.2, 0.6, 0.1], [1, 0, 1, 1, 0], threshold=0.5)
+    row = table.to_frame().iloc[0]
+
+    # Alerts on forecasts 0, 1 and 3: two hits, one false alarm, one miss, one correct negative
+    assert (row["hits"], row["misses"], row["false_alarms"], row["correct_negatives"]) == (2, 1, 1, 1)
+    assert row["hit_rate"] == pytest.approx(2 / 3)
+    assert row["false_alarm_rate"] == pytest.approx(1 / 2)
+    assert row["false_alarm_ratio"] == pytest.approx(1 / 3)
+    assert row["brier_score"] == pytest.approx((0.01 + 0.64 + 0.64 + 0.16 + 0.01) / 5)
+    assert row["brier_skill_score"] == pytest.approx(1 - 0.292 / (0.6 * 0.4))
+
+
+def test_merged_chunk_tables_equal_one_table():
+    rng = np.random.default_rng(2)
+    n = 5000
+    regions = rng.choice(["Nairobi", "Mombasa", "Kisumu"], n)
+    leads = rng.choice([0, 24, 48], n)
+    probability = rng.random(n)
+    observed = (rng.random(n) < probability).astype(float)
+    errors = rng.normal(0, 5, n)
+
+    whole = SkillTable()
+    whole.add(regions, leads, probability, observed, threshold=0.6, errors=errors)
+    merged = SkillTable()
+    for chunk in np.array_split(np.arange(n), 7):
+        part = SkillTable()
+        part.add(regions[chunk], leads[chunk], probability[chunk], observed[chunk], threshold=0.6,
+                 errors=errors[chunk])
+        merged.merge(part)
+
+    pd.testing.assert_frame_equal(merged.to_frame(), whole.to_frame())
+
+
+def test_missing_lead_times_are_skipped():
+    table = SkillTable()
+    table.add(["Nairobi"] * 3, [24.0, np.nan, 48.0], [0.9, 0.9, 0.1], [1, 1, 0], threshold=0.5)
+    frame = table.to_frame()
+
+    assert frame["lead_time_hours"].tolist() == [24, 48]
+    assert frame["forecasts"].sum() == 2
+
+
+def test_flood_backtest_is_independent_of_format_chunks_and_workers(tmp_path):
+    pytest.importorskip("pyarrow")
+    csv_path, parquet_path = str(tmp_path / "floods.csv"), str(tmp_path / "floods.parquet")
+    synthetic_flood_archive(csv_path, rows=20000, chunk_size=7000)
+    archive = pd.read_csv(csv_path)
+    archive.loc[::500, "lead_time_hours"] = np.nan
+    archive.to_csv(csv_path, index=False)
+    archive.to_parquet(parquet_path, index=False)
+    param_sets = [{}, {"alert_threshold": 0.4}]
+
+    expected = FloodBacktest(csv_path, chunk_size=100000).run(param_sets)
+    assert expected.loc[expected["region"] == "ALL", "forecasts"].sum() == 2 * (20000 - 40)
+    for backtest in (FloodBacktest(csv_path, chunk_size=3000),
+                     FloodBacktest(parquet_path, chunk_size=3000),
+                     FloodBacktest(csv_path, chunk_size=3000, workers=2)):
+        pd.testing.assert_frame_equal(backtest.run(param_sets), expected)
+
+
+def test_aqi_backtest_scores_every_issue_and_lead():
+    rng = np.random.default_rng(4)
+    hours = np.arange(24 * 20)
+    history = 100 + 30 * np.cos(2 * np.pi * hours / 24) + rng.normal(0, 5, (6, len(hours)))
+    backtest = AQIBacktest(history, end=datetime(2025, 6, 1, tzinfo=timezone.utc),
+                           regions=["Nairobi"] * 3 + ["Mombasa"] * 3,
+                           train_hours=24 * 14, issue_every=6, max_lead=12, block_issues=5)
+
+    frame = backtest.run({"alert_threshold": 120})
+
+    issues = len(range(24 * 14 - 1, len(hours) - 12 - 1, 6))
+    regional = frame[frame["region"] != "ALL"]
+    assert sorted(regional["lead_time_hours"].unique()) == list(range(1, 13))
+    assert (regional["forecasts"] == 3 * issues).all()
+    # The diurnal cycle is learnt, so errors stay near the noise level
+    assert (frame["mae"] < 15).all()
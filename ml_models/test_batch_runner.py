@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the resumable batch prediction runner
+"""
+
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_runner import BatchRunner
+
+
+class CrashingRunner(BatchRunner):
+    """Dies abruptly halfway through writing a chunk, before its checkpoint"""
+
+    def __init__(self, *args, crash_at: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.crash_at = crash_at
+
+    def write_chunk(self, index, result, checkpoint):
+        super().write_chunk(index, result, checkpoint)
+        if index == self.crash_at:
+            if self.output_format == "csv":
+                with open(self.output_path, "a") as f:
+                    f.write("999999,half a ro")
+            os._exit(1)
+
+
+def locations(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"id": np.arange(n),
+                         "latitude": rng.uniform(-4.7, 5.0, n),
+                         "longitude": rng.uniform(33.9, 41.9, n),
+                         "rainfall_24h": rng.uniform(0, 120, n),
+                         "elevation": rng.uniform(0, 2500, n)})
+
+
+def crash_then_resume(input_path, output_path, workers):
+    """Crash a single-process run in its third chunk, then resume it with the given workers"""
+    crashed = multiprocessing.get_context("fork").Process(
+        target=lambda: CrashingRunner(input_path, output_path, ["flood"], chunk_size=40, crash_at=2).run())
+    crashed.start()
+    crashed.join()
+    assert crashed.exitcode == 1
+
+    stats = BatchRunner(input_path, output_path, ["flood"], chunk_size=40, workers=workers).run()
+    assert stats["rows_this_run"] == stats["rows_done"] - 80
+    return stats
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_csv_resume_writes_each_row_once(tmp_path, workers):
+    frame = locations(230)
+    input_path, output_path = str(tmp_path / "in.csv"), str(tmp_path / "out.csv")
+    frame.to_csv(input_path, index=False)
+
+    stats = crash_then_resume(input_path, output_path, workers)
+
+    output = pd.read_csv(output_path)
+    assert stats["rows_done"] == 230
+    assert output["id"].tolist() == list(range(230))
+    assert output["flood_risk_level"].notna().all()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parquet_resume_writes_each_row_once(tmp_path, workers):
+    pytest.importorskip("pyarrow")
+    frame = locations(230)
+    input_path, output_path = str(tmp_path / "in.parquet"), str(tmp_path / "out")
+    frame.to_parquet(input_path, index=False)
+
+    stats = crash_then_resume(input_path, output_path, workers)
+
+    output = pd.concat(pd.read_parquet(os.path.join(output_path, name))
+                       for name in sorted(os.listdir(output_path)))
+    assert stats["rows_done"] == 230
+    assert output["id"].tolist() == list(range(230))
+
+
+def test_checkpoint_from_other_settings_is_rejected(tmp_path):
+    input_path, output_path = str(tmp_path / "in.csv"), str(tmp_path / "out.csv")
+    locations(50).to_csv(input_path, index=False)
+    BatchRunner(input_path, output_path, ["flood"], chunk_size=20).run()
+
+    with pytest.raises(ValueError):
+        BatchRunner(input_path, output_path, ["flood"], chunk_size=25).run()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for the AccuWeather circuit breaker and latency budget handling
+"""
+
+import threading
+import time
+
+import ecosentinel_predictor
+from circuit_breaker import CircuitBreaker
+from deadline import Deadline
+from ecosentinel_predictor import AccuWeatherAPI
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("test", reset_timeout=0)
+    open_breaker(breaker)
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("test", reset_timeout=60)
+    open_breaker(breaker)
+    breaker.opened_at -= 60
+
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_slow_success_counts_as_failure():
+    breaker = CircuitBreaker("test", failure_threshold=1, latency_threshold=1.0)
+    breaker.record_success(2.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_released_probe_can_be_retried():
+    breaker = CircuitBreaker("test", reset_timeout=0)
+    open_breaker(breaker)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.release_probe()
+    assert breaker.allow_request()
+
+
+def test_abandoned_probe_does_not_wedge_the_breaker(monkeypatch):
+    api = AccuWeatherAPI("test-key")
+    breaker = api.breakers["current"]
+    breaker.reset_timeout = 0
+    open_breaker(breaker)
+
+    release = threading.Event()
+
+    def slow_get(url, params=None, timeout=None):
+        release.wait(5)
+        return FakeResponse()
+
+    monkeypatch.setattr(ecosentinel_predictor.requests, "get", slow_get)
+    assert api._get("current", "http://example.invalid", {}, Deadline(0.05)) is None
+    release.set()
+
+    # Upstream has recovered: the next call probes it and closes the circuit
+    monkeypatch.setattr(ecosentinel_predictor.requests, "get", lambda url, params=None, timeout=None: FakeResponse())
+    response = api._get("current", "http://example.invalid", {}, Deadline(1.0))
+    assert response is not None and response.status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_exhausted_deadline_skips_upstream(monkeypatch):
+    api = AccuWeatherAPI("test-key")
+    calls = []
+    monkeypatch.setattr(ecosentinel_predictor.requests, "get",
+                        lambda url, params=None, timeout=None: calls.append(timeout) or FakeResponse())
+
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    assert api._get("current", "http://example.invalid", {}, deadline) is None
+    assert calls == []
+    assert api.breakers["current"].allow_request()
+
+
+def test_simulated_locations_are_not_cached(monkeypatch):
+    predictor = ecosentinel_predictor.EcoSentinelPredictor("test-key")
+    monkeypatch.setattr(predictor.weather_api, "_get", lambda endpoint, url, params, deadline=None: None)
+
+    location = predictor.find_location("Nairobi", deadline=Deadline(0.01))
+    assert location["source"] == "simulated"
+    assert "nairobi" not in predictor._location_cache
+
+
+def test_fallback_responses_are_capped_least_recently_used_first(monkeypatch):
+    api = AccuWeatherAPI("test-key", last_good_size=2)
+    monkeypatch.setattr(ecosentinel_predictor.requests, "get", lambda url, params=None, timeout=None: FakeResponse(
+        payload=[{"WeatherText": url.rsplit("/", 1)[-1]}]))
+    for location_key in ("a", "b", "a", "c"):
+        api.get_current_weather(location_key)
+
+    # "b" was used least recently when "c" arrived
+    assert [key for _, key in api._last_good] == ["a", "c"]
+    open_breaker(api.breakers["current"])
+    assert api.get_current_weather("a")["EcoSentinelDataSource"] == "stale-cache"
+    assert api.get_current_weather("b")["EcoSentinelDataSource"] == "simulated"
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for forward-looking flood risk over hourly forecasts
+"""
+
+import numpy as np
+import pytest
+
+from ecosentinel_predictor import RISK_LEVELS, EcoSentinelPredictor
+from static_features import StaticFeatureGrid
+
+# Six hours of 10 mm/h, then dry for the rest of two days
+HOURLY_RAIN = [10.0] * 6 + [0.0] * 42
+
+
+def test_rolling_total_and_risk_band_of_a_known_series():
+    predictor = EcoSentinelPredictor()
+    result = predictor.predict_flood_risk_forecast_batch([HOURLY_RAIN, HOURLY_RAIN], [0.0, 1000.0],
+                                                         ["loam", "clay"], rainfall_24h=[24.0, 24.0])
+
+    # Brute force: the past day at 1 mm/h followed by the forecast, summed over 24 h windows
+    series = np.concatenate([np.full(24, 1.0), HOURLY_RAIN])
+    expected = [series[hour + 1:hour + 25].sum() for hour in range(len(HOURLY_RAIN))]
+    np.testing.assert_allclose(result["accumulated_rain"], [expected, expected])
+    assert (expected[5], expected[23], expected[29]) == (78.0, 60.0, 0.0)
+
+    # At sea level on loam the score is accumulation / 100; at 1000 m on clay it is 0.325 / 50 of it
+    np.testing.assert_allclose(result["risk_score"][0], np.asarray(expected) / 100)
+    np.testing.assert_allclose(result["risk_score"][1], np.asarray(expected) * 0.325 / 50)
+    assert result["peak_hour"].tolist() == [5, 5]
+    np.testing.assert_allclose(result["peak_risk_score"], [0.78, 0.507])
+    bands = [RISK_LEVELS[int(score > 0.4) + int(score > 0.7)] for score in result["peak_risk_score"]]
+    assert bands == ["HIGH", "MEDIUM"]
+
+
+def test_forecast_uses_static_feature_grid(tmp_path, monkeypatch):
+    grid = StaticFeatureGrid.build(str(tmp_path), np.full((10, 10), 1000.0, dtype=np.float32),
+                                   np.ones((10, 10), dtype=np.uint8), max_latitude=0.0, min_longitude=36.0,
+                                   resolution=0.1)
+    predictor = EcoSentinelPredictor(feature_grid=grid)
+    location = {"city_name": "Testville", "latitude": -0.55, "longitude": 36.55, "elevation": 0.0,
+                "accuweather_key": "1"}
+    monkeypatch.setattr(predictor, "find_location", lambda city_name: location)
+    monkeypatch.setattr(predictor.weather_api, "get_hourly_forecast",
+                        lambda key, hours: [{"DateTime": f"h{i}", "Rain": {"Value": rain}}
+                                            for i, rain in enumerate(HOURLY_RAIN)])
+    monkeypatch.setattr(predictor, "get_real_weather_data", lambda key: {"rainfall_24h": 24.0})
+
+    result = predictor.predict_flood_risk_forecast("Testville")
+
+    # Grid elevation and soil (1000 m, clay) win over the location record (sea level, default soil)
+    assert result["static_features"]["elevation_source"] == "feature-grid"
+    assert result["peak_risk_score"] == pytest.approx(0.507)
+    assert result["peak_risk_level"] == "MEDIUM"
+    assert result["peak_time"] == "h5"
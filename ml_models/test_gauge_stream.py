@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for rain gauge stream ingestion
+"""
+
+import numpy as np
+
+from ecosentinel_predictor import EcoSentinelPredictor
+from gauge_stream import WINDOWS, GaugeStreamProcessor, QueueSource, RainfallWindows, reading_minute
+
+
+def test_window_totals_match_naive_sum():
+    rng = np.random.default_rng(7)
+    windows = RainfallWindows(capacity=2)
+    rows = [windows.add_gauge(0) for _ in range(3)]
+    history = {row: [] for row in rows}
+
+    clock = {row: 0 for row in rows}
+    for _ in range(3000):
+        row = int(rng.choice(rows))
+        # Mostly forward steps, with late readings and occasional long gaps
+        step = int(rng.choice([0, 1, 2, 45, 400, 2000], p=[0.2, 0.4, 0.2, 0.1, 0.07, 0.03]))
+        clock[row] += step
+        minute = clock[row] - int(rng.integers(0, 30)) if rng.random() < 0.2 else clock[row]
+        amount = float(rng.exponential(0.5))
+        if windows.add(row, minute, amount):
+            history[row].append((minute, amount))
+
+    for row in rows:
+        head = windows.head(row)
+        expected = [sum(amount for minute, amount in history[row] if head - minute < length)
+                    for length in WINDOWS.values()]
+        np.testing.assert_allclose(windows.totals([row])[0], expected, rtol=1e-4, atol=1e-3)
+
+
+def test_future_readings_do_not_freeze_the_gauge():
+    now = 1748779260.0
+    processor = GaugeStreamProcessor(QueueSource(), EcoSentinelPredictor(),
+                                     gauges={"KE-NBO-014": {"latitude": -1.29, "longitude": 36.82,
+                                                            "minute": reading_minute(now)}})
+
+    processor.process([{"gauge_id": "KE-NBO-014", "timestamp": now * 1000, "rainfall_mm": 0.1}], now=now)
+    processor.process([{"gauge_id": "KE-NBO-014", "timestamp": now, "rainfall_mm": 2.0},
+                       {"gauge_id": "KE-NBO-014", "timestamp": now + 60, "rainfall_mm": 3.0}], now=now)
+
+    assert processor.stats["future"] == 1
+    assert processor.stats["dropped"] == 0
+    assert processor.stats["readings"] == 2
+    assert processor.windows.totals([0])[0].tolist() == [5.0, 5.0, 5.0]
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for tiled NDVI change detection
+"""
+
+import numpy as np
+import pytest
+
+from ndvi_change import NDVIChangeEngine, ndvi_change_stats
+
+SIZE = 64
+RESOLUTION = 0.001  # Degrees per pixel
+CENTER = (-SIZE * RESOLUTION / 2, 36.0 + SIZE * RESOLUTION / 2)
+
+
+def write_mosaic(path, red, nir):
+    """Two-band GeoTIFF on a small EPSG:4326 grid, 0 marking nodata, in 16-pixel blocks"""
+    rasterio = pytest.importorskip("rasterio")
+    from rasterio.transform import from_origin
+
+    with rasterio.open(path, "w", driver="GTiff", width=SIZE, height=SIZE, count=2, dtype="uint16",
+                       crs="EPSG:4326", transform=from_origin(36.0, 0.0, RESOLUTION, RESOLUTION),
+                       nodata=0, tiled=True, blockxsize=16, blockysize=16) as dataset:
+        dataset.write(red.astype(np.uint16), 1)
+        dataset.write(nir.astype(np.uint16), 2)
+    return str(path)
+
+
+@pytest.fixture
+def mosaics(tmp_path):
+    red_before, nir_before = np.full((SIZE, SIZE), 100), np.full((SIZE, SIZE), 500)
+    red_after, nir_after = red_before.copy(), nir_before.copy()
+    # The western half loses its vegetation (NDVI 0.667 -> -0.333)
+    red_after[:, :SIZE // 2], nir_after[:, :SIZE // 2] = 400, 200
+    # Nodata on one date only, in each half
+    red_after[:4, :4] = 0
+    nir_before[-4:, -4:] = 0
+    return (write_mosaic(tmp_path / "before.tif", red_before, nir_before),
+            write_mosaic(tmp_path / "after.tif", red_after, nir_after))
+
+
+def test_masked_pixels_on_either_date_are_left_out(mosaics):
+    engine = NDVIChangeEngine(*mosaics, tile_size=16, workers=1)
+    result = engine.analyze(*CENTER, area_km2=100.0)
+
+    assert result["tiles"] == 16
+    assert result["valid_pixels"] == SIZE * SIZE - 32
+    assert result["vegetation_cover"] == 1.0
+    assert result["vegetation_loss_fraction"] == 0.5
+    assert result["mean_ndvi_change"] == pytest.approx(-0.5, abs=1e-4)
+    assert result["lost_area_km2"] == pytest.approx((SIZE * SIZE / 2 - 16) * engine.pixel_area_km2(CENTER[0]),
+                                                    abs=1e-4)
+
+
+def test_worker_pool_matches_single_process(mosaics):
+    single = NDVIChangeEngine(*mosaics, tile_size=16, workers=1).analyze(*CENTER, area_km2=10.0)
+    engine = NDVIChangeEngine(*mosaics, tile_size=16, workers=2)
+    try:
+        assert engine.analyze(*CENTER, area_km2=10.0) == single
+    finally:
+        engine.close()
+
+
+def test_mismatched_grids_are_rejected(mosaics, tmp_path):
+    rasterio = pytest.importorskip("rasterio")
+    with rasterio.open(mosaics[1]) as dataset:
+        profile = dict(dataset.profile, width=SIZE // 2)
+        data = dataset.read()[:, :, :SIZE // 2]
+    with rasterio.open(tmp_path / "cropped.tif", "w", **profile) as dataset:
+        dataset.write(data)
+
+    with pytest.raises(ValueError, match="same CRS"):
+        NDVIChangeEngine(mosaics[0], str(tmp_path / "cropped.tif"))
+
+
+def test_tile_stats_skip_nan_pixels():
+    red_before, nir_before = np.array([[100.0, 100.0, np.nan]]), np.array([[500.0, 500.0, 500.0]])
+    red_after, nir_after = np.array([[400.0, 100.0, 100.0]]), np.array([[200.0, np.nan, 500.0]])
+
+    valid, vegetated, lost, change_sum = ndvi_change_stats(red_before, nir_before, red_after, nir_after)
+    assert (valid, vegetated, lost) == (1, 1, 1)
+    assert change_sum == pytest.approx(-1.0)
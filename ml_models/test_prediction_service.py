@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the micro-batching prediction service
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from aqi_forecaster import AQIForecaster
+from ecosentinel_predictor import EcoSentinelPredictor
+from prediction_service import PredictionService
+from static_features import StaticFeatureGrid
+
+
+def post_flood(app, body):
+    """Send one POST /predict/flood through the ASGI app, returning (status, json)"""
+    return post(app, "/predict/flood", body)
+
+
+def post(app, path, body):
+    """Send one POST through the ASGI app, returning (status, json)"""
+    async def run():
+        messages = [{"type": "http.request", "body": json.dumps(body).encode()}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await app({"type": "http", "method": "POST", "path": path}, receive, send)
+        await app.batcher.stop()
+        return sent[0]["status"], json.loads(sent[1]["body"])
+
+    return asyncio.run(run())
+
+
+def test_non_numeric_field_is_rejected():
+    app = PredictionService(EcoSentinelPredictor())
+    status, body = post_flood(app, {"latitude": "abc", "longitude": 36.8, "rainfall_24h": 10, "elevation": 100})
+
+    assert status == 400
+    assert "latitude" in body["error"]
+
+
+def test_numeric_strings_are_coerced():
+    app = PredictionService(EcoSentinelPredictor())
+    status, body = post_flood(app, [
+        {"latitude": "-1.29", "longitude": 36.8, "rainfall_24h": "80", "elevation": 100},
+        {"latitude": -1.0, "longitude": 36.0, "rainfall_24h": 5, "elevation": 1500}
+    ])
+
+    assert status == 200
+    assert [result["risk_level"] for result in body] == ["HIGH", "LOW"]
+    assert body[0]["factors"]["rainfall_24h"] == 80.0
+
+
+def test_points_without_grid_elevation_are_rejected(tmp_path):
+    grid = StaticFeatureGrid.build(str(tmp_path), np.full((10, 10), 500.0, dtype=np.float32),
+                                   np.ones((10, 10), dtype=np.uint8), max_latitude=1.0, min_longitude=0.0,
+                                   resolution=0.1)
+    app = PredictionService(EcoSentinelPredictor(feature_grid=grid))
+
+    status, body = post_flood(app, {"latitude": 0.55, "longitude": 0.55, "rainfall_24h": 40})
+    assert status == 200
+    assert body["factors"]["elevation"] == 500.0
+
+    status, body = post_flood(app, {"latitude": -1.29, "longitude": 36.82, "rainfall_24h": 40})
+    assert status == 400
+    assert "elevation" in body["error"]
+
+
+def test_station_aqi_observations_advance_the_model():
+    predictor = EcoSentinelPredictor()
+    history = np.full((2, 24 * 10), 60.0)
+    predictor.aqi_model = AQIForecaster().fit(history, end=datetime(2025, 6, 1, 11, tzinfo=timezone.utc),
+                                              station_ids=["KE-1", "KE-2"], latitudes=[-1.29, -4.04],
+                                              longitudes=[36.82, 39.67])
+    app = PredictionService(predictor)
+
+    status, body = post(app, "/observe/air_quality",
+                        {"readings": {"KE-1": 150, "KE-9": 80}, "observed_at": "2025-06-01T12:00:00Z"})
+    assert (status, body) == (200, {"matched": 1, "unknown_stations": 1})
+    assert predictor.aqi_model.state[0, -1] == 150.0
+
+    status, body = post(app, "/observe/air_quality", {"readings": {"KE-1": "high"}})
+    assert status == 400 and "KE-1" in body["error"]
+
+    timestamps = [datetime.fromisoformat(p["timestamp"])
+                  for p in predictor.predict_air_quality(-1.29, 36.82, hours_ahead=3)["predictions"]]
+    assert all(t.utcoffset().total_seconds() == 0 for t in timestamps)
+    assert timestamps[2] - timestamps[0] == timedelta(hours=2)
+
+
+def test_import_does_not_build_a_predictor(monkeypatch):
+    import importlib
+    import prediction_service
+
+    def fail(self, *args, **kwargs):
+        raise AssertionError("predictor built on import")
+
+    monkeypatch.setattr(EcoSentinelPredictor, "__init__", fail)
+    importlib.reload(prediction_service)
+    assert not hasattr(prediction_service, "app")
+
+    monkeypatch.undo()
+    assert isinstance(prediction_service.create_app(), prediction_service.PredictionService)
+
+
+def test_shutdown_closes_only_an_owned_predictor(monkeypatch):
+    closed = []
+    monkeypatch.setattr(EcoSentinelPredictor, "close", lambda self: closed.append(self))
+
+    async def lifespan(app):
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        await app({"type": "lifespan"}, receive, send)
+        return sent
+
+    owned = PredictionService()
+    assert asyncio.run(lifespan(owned)) == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    asyncio.run(lifespan(PredictionService(EcoSentinelPredictor())))
+    assert closed == [owned.predictor]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for spatial rainfall interpolation
+"""
+
+import numpy as np
+import pytest
+
+from rainfall_interpolation import RainfallInterpolator, to_xyz
+
+rng = np.random.default_rng(9)
+ANCHOR_LAT, ANCHOR_LON = rng.uniform(-4.7, 5.0, 40), rng.uniform(33.9, 41.9, 40)
+ANCHOR_RAIN = rng.gamma(2.0, 10.0, 40)
+
+
+@pytest.mark.parametrize("options", [{"method": "idw"}, {"method": "kriging", "nugget": 0.0}])
+def test_estimate_at_an_anchor_is_its_reading(options):
+    interpolator = RainfallInterpolator(**options).fit(ANCHOR_LAT, ANCHOR_LON, ANCHOR_RAIN)
+    result = interpolator.interpolate(ANCHOR_LAT, ANCHOR_LON)
+
+    np.testing.assert_allclose(result["rainfall_24h"], ANCHOR_RAIN, rtol=1e-5)
+    np.testing.assert_array_equal(result["interpolation_distance_km"], 0)
+
+
+def test_idw_matches_brute_force_over_nearest_anchors():
+    query_lat, query_lon = rng.uniform(-4.7, 5.0, 500), rng.uniform(33.9, 41.9, 500)
+    result = RainfallInterpolator(neighbors=5, power=2.0, chunk_size=64).fit(
+        ANCHOR_LAT, ANCHOR_LON, ANCHOR_RAIN).interpolate(query_lat, query_lon)
+
+    distances = np.linalg.norm(to_xyz(query_lat, query_lon)[:, None, :] - to_xyz(ANCHOR_LAT, ANCHOR_LON)[None],
+                               axis=-1)
+    nearest = np.argsort(distances, axis=1)[:, :5]
+    nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+    weights = 1 / nearest_distances ** 2
+    expected = (weights * ANCHOR_RAIN[nearest]).sum(axis=1) / weights.sum(axis=1)
+
+    np.testing.assert_allclose(result["rainfall_24h"], expected, rtol=1e-5)
+    np.testing.assert_allclose(result["interpolation_distance_km"], nearest_distances[:, 0], rtol=1e-5)
+
+
+class AnchorPredictor:
+    """Stand-in predictor serving fixed location and weather lookups"""
+
+    def __init__(self, anchors):
+        self.anchors = anchors
+
+    def find_location(self, city):
+        latitude, longitude, _, location_source, _ = self.anchors[city]
+        return {"latitude": latitude, "longitude": longitude, "accuweather_key": city, "source": location_source}
+
+    def get_real_weather_data(self, key):
+        _, _, rainfall, _, weather_source = self.anchors[key]
+        return {"rainfall_24h": rainfall, "source": weather_source}
+
+
+def test_anchors_with_simulated_data_are_left_out():
+    predictor = AnchorPredictor({
+        "Nairobi": (-1.29, 36.82, 10.0, "live", "live"),
+        "Nakuru": (-0.30, 36.07, 30.0, "stale-cache", "stale-cache"),
+        "Kisumu": (-0.09, 34.77, 500.0, "live", "simulated"),
+        "Atlantis": (0.0, 35.0, 500.0, "simulated", "live"),
+    })
+    interpolator = RainfallInterpolator.from_anchor_cities(predictor, list(predictor.anchors), workers=2)
+
+    assert len(interpolator) == 2
+    assert interpolator.interpolate([-0.5], [35.0])["rainfall_24h"][0] < 30.0
+
+    simulated_only = AnchorPredictor({"Kisumu": (-0.09, 34.77, 500.0, "live", "simulated")})
+    with pytest.raises(ValueError, match="real weather"):
+        RainfallInterpolator.from_anchor_cities(simulated_only, ["Kisumu"])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-process shared weather cache
+"""
+
+import math
+import multiprocessing
+import os
+import time
+
+from shared_cache import SharedWeatherCache
+
+fork = multiprocessing.get_context("fork")
+
+
+def fill_in_process(path, calls_path, barrier, results):
+    cache = SharedWeatherCache(path, ttl=60)
+
+    def fill():
+        with open(calls_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.3)
+        return {"rainfall_24h": 12.5, "filled_by": os.getpid()}
+
+    barrier.wait()
+    results.put(cache.get_or_fill("207195", fill))
+
+
+def die_while_filling(path):
+    cache = SharedWeatherCache(path, ttl=60)
+    cache.get_or_fill("207195", lambda: os._exit(1))
+
+
+def test_concurrent_processes_fill_once(tmp_path):
+    path, calls_path = str(tmp_path / "cache.db"), str(tmp_path / "calls.txt")
+    SharedWeatherCache(path)  # Create the schema up front
+    barrier, results = fork.Barrier(6), fork.Queue()
+    processes = [fork.Process(target=fill_in_process, args=(path, calls_path, barrier, results)) for _ in range(6)]
+    for process in processes:
+        process.start()
+    answers = [results.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+
+    with open(calls_path) as f:
+        callers = f.read().split()
+    assert len(callers) == 1
+    assert all(answer == {"rainfall_24h": 12.5, "filled_by": int(callers[0])} for answer in answers)
+
+
+def test_lease_of_dead_owner_is_taken_over(tmp_path):
+    path = str(tmp_path / "cache.db")
+    dead = fork.Process(target=die_while_filling, args=(path,))
+    dead.start()
+    dead.join()
+    assert dead.exitcode == 1
+
+    cache = SharedWeatherCache(path, ttl=60, lease_timeout=0.3)
+    calls = []
+    started = time.monotonic()
+    data = cache.get_or_fill("207195", lambda: calls.append(1) or {"rainfall_24h": 3.0}, wait_timeout=10)
+
+    assert data == {"rainfall_24h": 3.0}
+    assert calls == [1]
+    # Waited for the lease to expire, then filled under its own lease instead of timing out
+    assert 0.25 <= time.monotonic() - started < 5
+    assert cache.stats["fills"] == 1 and cache.stats["waits"] >= 1
+    assert cache.get("207195") == {"rainfall_24h": 3.0}
+    assert cache._connection().execute("SELECT COUNT(*) FROM fills").fetchone()[0] == 0
+
+
+def test_live_lease_is_not_taken_over(tmp_path):
+    path = str(tmp_path / "cache.db")
+    holder = SharedWeatherCache(path, lease_timeout=60)
+    assert holder._try_acquire("207195")
+
+    waiter = SharedWeatherCache(path, lease_timeout=60)
+    assert not waiter._try_acquire("207195")
+    data = waiter.get_or_fill("207195", lambda: {"rainfall_24h": 1.0}, wait_timeout=0.2)
+
+    # The waiter gave up and fetched directly without caching or stealing the lease
+    assert data == {"rainfall_24h": 1.0}
+    assert waiter.stats["fills"] == 0
+    assert waiter.get("207195") is None
+    assert not waiter._try_acquire("207195")
+
+
+def test_evict_drops_expired_rows_and_keeps_newest(tmp_path):
+    cache = SharedWeatherCache(str(tmp_path / "cache.db"), max_entries=2, retention=0.2, lease_timeout=0.2)
+    cache.put("expired", {"rainfall_24h": 1.0})
+    cache._try_acquire("abandoned")
+    time.sleep(0.3)
+    for key in ("oldest", "middle", "newest"):
+        cache.put(key, {"rainfall_24h": 2.0})
+        time.sleep(0.01)
+
+    cache.evict()
+
+    remaining = [row[0] for row in cache._connection().execute("SELECT location_key FROM weather ORDER BY fetched_at")]
+    assert remaining == ["middle", "newest"]
+    assert cache.get("oldest", max_age=math.inf) is None
+    assert cache._connection().execute("SELECT COUNT(*) FROM fills").fetchone()[0] == 0
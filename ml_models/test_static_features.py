@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Tests for the static feature grid
+"""
+
+import numpy as np
+import pytest
+
+from static_features import SOIL_CLASSES, StaticFeatureGrid
+
+
+def test_out_of_range_soil_codes_are_rejected(tmp_path):
+    soil_class = np.ones((4, 4), dtype=np.uint8)
+    soil_class[2, 3] = len(SOIL_CLASSES)
+
+    with pytest.raises(ValueError, match="Soil class codes"):
+        StaticFeatureGrid.build(str(tmp_path), np.zeros((4, 4), dtype=np.float32), soil_class,
+                                max_latitude=1.0, min_longitude=0.0, resolution=0.25)
+
+
+def test_lookup_outside_grid_or_over_nodata_is_missing(tmp_path):
+    elevation = np.full((4, 4), 100.0, dtype=np.float32)
+    elevation[0, 0] = np.nan
+    grid = StaticFeatureGrid.build(str(tmp_path), elevation, np.full((4, 4), 1, dtype=np.uint8),
+                                   max_latitude=1.0, min_longitude=0.0, resolution=0.25)
+
+    assert grid.lookup(0.5, 0.5) == {"elevation": 100.0, "soil_type": "clay", "slope": 0.0}
+    assert grid.lookup(0.9, 0.1) is None
+    assert grid.lookup(-1.29, 36.82) is None
+    assert grid.lookup_batch([0.9, 0.5], [0.1, 0.5])["valid"].tolist() == [False, True]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic weather generator
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from synthetic_weather import SyntheticWeatherGenerator
+
+START = datetime(2025, 6, 1, 0)
+
+
+def test_overlapping_windows_agree():
+    generator = SyntheticWeatherGenerator(seed=3)
+    day = generator.generate([-1.29, 0.5], [36.82, 37.0], hours=48, start=START)
+    shifted = generator.generate([-1.29, 0.5], [36.82, 37.0], hours=24, start=START + timedelta(hours=12))
+
+    for field in ("temperature", "humidity", "wind_speed", "rain"):
+        np.testing.assert_allclose(day[field][:, 12:36], shifted[field], atol=1e-4)
+
+
+def test_values_do_not_depend_on_chunking():
+    generator = SyntheticWeatherGenerator(seed=3)
+    latitudes, longitudes = np.linspace(-4, 4, 10), np.linspace(34, 41, 10)
+    whole = generator.generate(latitudes, longitudes, hours=6, start=START)
+    chunks = list(generator.iter_chunks(latitudes, longitudes, hours=6, start=START, chunk_size=3))
+
+    np.testing.assert_allclose(np.concatenate([chunk["rain"] for chunk in chunks]), whole["rain"], atol=1e-5)
+
+
+def test_weights_keep_unit_variance_and_lag_one_correlation():
+    generator = SyntheticWeatherGenerator(seed=5, temporal_correlation=0.9)
+    weights = generator._weights(4000, start_hour=480000)[0]
+
+    assert abs(weights.var() - 1.0) < 0.05
+    lag_one = np.mean([np.corrcoef(series[:-1], series[1:])[0, 1] for series in weights])
+    assert abs(lag_one - 0.9) < 0.02
+
+
+@pytest.mark.parametrize("rho", [1.0, 1.5, -0.1, float("nan")])
+def test_temporal_correlation_outside_unit_interval_is_rejected(rho):
+    with pytest.raises(ValueError, match="temporal_correlation"):
+        SyntheticWeatherGenerator(temporal_correlation=rho)
+
+
+def test_zero_temporal_correlation_gives_independent_hours():
+    generator = SyntheticWeatherGenerator(seed=5, temporal_correlation=0.0)
+    weights = generator._weights(4000, start_hour=480000)[0]
+
+    assert abs(weights.var() - 1.0) < 0.05
+    assert abs(np.mean([np.corrcoef(series[:-1], series[1:])[0, 1] for series in weights])) < 0.02
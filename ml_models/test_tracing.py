@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for opt-in pipeline tracing
+"""
+
+import json
+
+import pytest
+
+from ecosentinel_predictor import EcoSentinelPredictor
+from tracing import NOOP_SPAN, InMemoryExporter, JsonlExporter, SpanExporter, current_span, span, traced, tracer
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    tracer.configure(exporter)
+    yield exporter
+    tracer.configure(None)
+
+
+def tree(spans):
+    """Span names as (name, parent name) pairs in finishing order"""
+    names = {s["span_id"]: s["name"] for s in spans}
+    return [(s["name"], names.get(s["parent_id"])) for s in spans]
+
+
+def test_flood_check_records_nested_pipeline_spans(exporter, monkeypatch):
+    monkeypatch.delenv("ACCUWEATHER_API_KEY", raising=False)
+    result = EcoSentinelPredictor().predict_flood_risk_with_location("Nairobi")
+
+    assert tree(exporter.spans) == [
+        ("search_cities", "find_location"),
+        ("find_location", "predict_flood_risk_with_location"),
+        ("get_current_weather", "get_real_weather_data"),
+        ("parse_weather", "get_real_weather_data"),
+        ("get_real_weather_data", "predict_flood_risk_with_location"),
+        ("score_flood_risk", "predict_flood_risk_with_location"),
+        ("predict_flood_risk_with_location", None),
+    ]
+    assert len({s["trace_id"] for s in exporter.spans}) == 1
+    root = exporter.spans[-1]
+    assert root["attributes"] == {"city_name": "Nairobi", "data_source": result["data_source"],
+                                  "degraded": result["degraded"]}
+    assert exporter.spans[-2]["attributes"]["risk_level"] == result["risk_level"]
+
+
+def test_no_spans_are_recorded_while_disabled():
+    exporter = InMemoryExporter()
+    tracer.configure(exporter)
+    tracer.configure(None)
+
+    EcoSentinelPredictor().predict_flood_risk_with_location("Nairobi")
+    with span("manual") as manual:
+        manual.set_attribute("ignored", True)
+        assert manual is NOOP_SPAN
+        assert current_span() is NOOP_SPAN
+
+    assert exporter.spans == []
+
+
+def test_jsonl_exporter_writes_one_line_per_span(tmp_path):
+    path = tmp_path / "traces.jsonl"
+
+    @traced("outer")
+    def outer():
+        with span("inner", step=1):
+            raise ValueError("bad payload")
+
+    tracer.configure(JsonlExporter(str(path)))
+    try:
+        with pytest.raises(ValueError):
+            outer()
+    finally:
+        tracer.configure(None)
+
+    inner, outer_span = [json.loads(line) for line in path.read_text().splitlines()]
+    assert (inner["name"], outer_span["name"]) == ("inner", "outer")
+    assert inner["parent_id"] == outer_span["span_id"] and outer_span["parent_id"] is None
+    assert inner["attributes"] == {"step": 1, "error": "ValueError: bad payload"}
+    assert inner["status"] == outer_span["status"] == "error"
+    assert inner["duration_ms"] >= 0
+
+
+def test_failing_exporter_does_not_break_the_call():
+    class BrokenExporter(SpanExporter):
+        def export(self, span):
+            raise OSError("disk full")
+
+    tracer.configure(BrokenExporter())
+    try:
+        assert traced("work")(lambda: 42)() == 42
+    finally:
+        tracer.configure(None)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk AccuWeather archive ingestion
+"""
+
+import gzip
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+
+from weather_archive import LOCATION_KEY_WIDTH, ColumnarWriter, ingest_file, iter_ingested
+
+
+def current(epoch_time, rainfall):
+    return {"EpochTime": epoch_time,
+            "Temperature": {"Metric": {"Value": 21.5}},
+            "PrecipitationSummary": {"Past24Hours": {"Metric": {"Value": rainfall}}}}
+
+
+def test_non_numeric_values_are_counted_as_malformed(tmp_path):
+    path = tmp_path / "207195_2024-05-01T06.json"
+    path.write_text(json.dumps([current(100, 1.5), current(200, "heavy"), current(300, 4.0)]))
+
+    records, malformed = ingest_file(str(path))
+    assert malformed == 1
+    assert records["epoch_time"].tolist() == [100, 300]
+    assert records["location_key"].tolist() == ["207195", "207195"]
+
+
+def test_long_location_keys_are_rejected(tmp_path):
+    path = tmp_path / "archive.jsonl"
+    lines = [{"location_key": "k" * (LOCATION_KEY_WIDTH + 1), "payload": current(100, 1.0)},
+             {"location_key": "207195", "payload": current(200, 2.0)}]
+    path.write_text("\n".join(json.dumps(line) for line in lines))
+
+    records, malformed = ingest_file(str(path))
+    assert malformed == 1
+    assert records["location_key"].tolist() == ["207195"]
+
+
+def test_hourly_records_keep_issue_time(tmp_path):
+    forecast = [{"EpochDateTime": 1714546800 + 3600 * h, "Rain": {"Value": 0.5}} for h in range(3)]
+    (tmp_path / "207195_2024-05-01T06.json").write_text(json.dumps(forecast))
+    (tmp_path / "other.jsonl").write_text(json.dumps(
+        {"location_key": "180867", "issued_at": 1714546800, "payload": forecast[:1]}))
+
+    (first, _), (second, _) = iter_ingested([str(tmp_path)], kind="hourly")
+    issued = int(datetime(2024, 5, 1, 6, tzinfo=timezone.utc).timestamp())
+    assert first["issued_at"].tolist() == [issued] * 3
+    assert (first["epoch_time"] - first["issued_at"]).tolist() == [3600, 7200, 10800]
+    assert second["issued_at"].tolist() == [1714546800]
+
+
+def test_npz_output_is_written_part_by_part(tmp_path):
+    for i in range(3):
+        (tmp_path / f"{i}_2024-05-01.json").write_text(json.dumps([current(100 * i + j, j) for j in range(4)]))
+
+    output = str(tmp_path / "out.npz")
+    with ColumnarWriter(output) as writer:
+        for records, _ in iter_ingested([str(tmp_path)]):
+            writer.write(records)
+
+    with np.load(output) as saved:
+        assert saved["location_key"].tolist() == [str(i) for i in range(3) for _ in range(4)]
+        assert saved["rainfall_24h"].tolist() == [0.0, 1.0, 2.0, 3.0] * 3
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".ingest-")]
+
+
+def test_file_failing_partway_counts_as_malformed(tmp_path):
+    corrupt = tmp_path / "207195_2024-05-01.jsonl"
+    corrupt.write_text("\n".join([json.dumps(current(100, 1.0)), json.dumps(current(200, 2.0)), "{\"EpochTime\": 3"]))
+    records, malformed = ingest_file(str(corrupt))
+    assert (records["epoch_time"].tolist(), malformed) == ([100, 200], 1)
+
+    truncated = tmp_path / "180867_2024-05-01.jsonl.gz"
+    data = gzip.compress("\n".join(json.dumps(current(100 * i, 1.0)) for i in range(1000)).encode())
+    truncated.write_bytes(data[:len(data) // 2])
+    records, malformed = ingest_file(str(truncated))
+    assert malformed == 1
+    assert 0 < len(records) < 1000
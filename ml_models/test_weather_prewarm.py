@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for the weather pre-warming scheduler
+"""
+
+import pytest
+
+from ecosentinel_predictor import EcoSentinelPredictor
+from weather_prewarm import PrewarmScheduler, TokenBucket
+
+GOLDEN_RATIO = 0.6180339887
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakePredictor:
+    """Stand-in predictor whose refreshes return queued results (None for no live weather)"""
+
+    def __init__(self, results=None):
+        self.results = results or {}
+        self.calls = []
+
+    def refresh_location(self, city_name):
+        self.calls.append(city_name)
+        result = self.results.get(city_name, {"risk_level": "LOW"})
+        if isinstance(result, list):
+            result = result.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result and {"updated_at": "2025-06-01T12:00:00", **result}
+
+
+def due_in(scheduler, clock):
+    """Seconds until each location's next refresh"""
+    return {city: due - clock() for due, city in scheduler._queue}
+
+
+def test_token_bucket_refills_at_the_quota_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_second=0.1, capacity=2, clock=clock)
+
+    assert bucket.try_acquire() == bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(10.0)
+    clock.now += 4
+    assert bucket.try_acquire() == pytest.approx(6.0)
+    clock.now += 6
+    assert bucket.try_acquire() == 0.0
+
+
+def test_first_refreshes_follow_the_golden_ratio_stagger():
+    clock = FakeClock()
+    cities = [f"city-{i}" for i in range(8)]
+    scheduler = PrewarmScheduler(FakePredictor(), cities, base_interval=1000, daily_call_quota=100000, clock=clock)
+
+    offsets = due_in(scheduler, clock)
+    assert offsets == pytest.approx({city: (i * GOLDEN_RATIO % 1.0) * 1000 for i, city in enumerate(cities)})
+    # Eight locations split the interval into gaps of at most twice the even spacing
+    assert max(b - a for a, b in zip(sorted(offsets.values()), sorted(offsets.values())[1:])) < 2 * 1000 / 8
+
+    scheduler.add_location("late")
+    assert due_in(scheduler, clock)["late"] == pytest.approx((8 * GOLDEN_RATIO % 1.0) * 1000)
+
+
+def test_refreshes_run_in_due_order_within_the_bucket():
+    clock = FakeClock()
+    predictor = FakePredictor()
+    scheduler = PrewarmScheduler(predictor, ["a", "b", "c"], base_interval=1000, daily_call_quota=86400,
+                                 min_interval=0, clock=clock)
+
+    assert scheduler.run_due() == 0.0  # "a" is due immediately
+    assert scheduler.run_due() == pytest.approx(236.07, abs=0.01)  # "c" is next, at 0.236 of the interval
+    start = clock.now
+    while len(predictor.calls) < 4:
+        clock.now += scheduler.run_due()
+    assert predictor.calls == ["a", "c", "b", "a"]
+    assert clock.now - start == pytest.approx(1000)
+
+    # A single-token bucket refilling at one call a second holds back a second due location
+    scheduler.add_location("d")
+    clock.now += 1000
+    assert scheduler.run_due() == 0.0
+    assert scheduler.run_due() == pytest.approx(1.0)
+
+
+def test_quota_is_split_by_risk_weight():
+    scheduler = PrewarmScheduler(FakePredictor(), ["Kibera", "Mathare", "Kisumu"], base_interval=1800,
+                                 daily_call_quota=50, min_interval=0, clock=FakeClock())
+    for city, risk_level in (("Kibera", "HIGH"), ("Mathare", "MEDIUM"), ("Kisumu", "LOW")):
+        scheduler._status[city]["risk_level"] = risk_level
+
+    intervals = {level: scheduler.next_interval(level) for level in ("HIGH", "MEDIUM", "LOW")}
+    calls_per_day = {level: 86400 / interval for level, interval in intervals.items()}
+
+    # Weights 4 : 2 : 1 share the 50 calls a day
+    assert sum(calls_per_day.values()) == pytest.approx(50)
+    assert calls_per_day["HIGH"] == pytest.approx(2 * calls_per_day["MEDIUM"])
+    assert calls_per_day["MEDIUM"] == pytest.approx(2 * calls_per_day["LOW"])
+
+    generous = PrewarmScheduler(FakePredictor(), ["Kibera"], base_interval=1800, daily_call_quota=100000,
+                                min_interval=0, clock=FakeClock())
+    assert generous.next_interval("HIGH") == 450
+    assert generous.next_interval("LOW") == 1800
+
+
+def test_failures_back_off_and_reset_on_success():
+    clock = FakeClock()
+    results = [ConnectionError("upstream down"), None, None, None, {"risk_level": "HIGH"}]
+    scheduler = PrewarmScheduler(FakePredictor({"Kisumu": results}), ["Kisumu"], base_interval=1000,
+                                 daily_call_quota=100000, min_interval=0, clock=clock)
+
+    intervals = []
+    for _ in range(5):
+        assert scheduler.run_due() == 0.0
+        intervals.append(due_in(scheduler, clock)["Kisumu"])
+        clock.now += intervals[-1]
+
+    assert intervals == pytest.approx([2000, 4000, 8000, 8000, 250])
+    assert scheduler.status()["Kisumu"]["failures"] == 0
+
+
+def test_refresh_without_live_weather_counts_as_failure(monkeypatch):
+    monkeypatch.delenv("ACCUWEATHER_API_KEY", raising=False)
+    scheduler = PrewarmScheduler(FakePredictor({"Nairobi": [{"risk_level": "HIGH"}, None]}), ["Nairobi"],
+                                 clock=FakeClock())
+    scheduler.refresh("Nairobi")
+    assert scheduler.refresh("Nairobi") is None
+
+    # The last known risk level is kept
+    assert scheduler.status()["Nairobi"] == {"risk_level": "HIGH", "last_refresh": "2025-06-01T12:00:00",
+                                             "failures": 1}
+
+    # Without an API key the predictor only has simulated weather, which is not a refresh
+    offline = PrewarmScheduler(EcoSentinelPredictor(), ["Nairobi"], clock=FakeClock())
+    assert offline.refresh("Nairobi") is None
+    assert offline.status()["Nairobi"]["failures"] == 1
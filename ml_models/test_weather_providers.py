@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the pluggable weather providers
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from weather_providers import CompositeWeatherProvider, StaticWeatherProvider, StationFeedProvider
+
+LOCATION = {"key": "207195", "latitude": -1.29, "longitude": 36.82}
+READING = {"temperature": 22.0, "humidity": 70, "rainfall_24h": 12.5}
+
+
+def observed(minutes_ago):
+    return (datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)).isoformat()
+
+
+def failing(location):
+    raise ConnectionError("upstream down")
+
+
+def settle(composite):
+    """Wait for background calls so their stats are counted"""
+    composite._executor.shutdown(wait=True)
+
+
+def test_fastest_skips_slow_and_failing_providers():
+    composite = CompositeWeatherProvider([
+        StaticWeatherProvider("broken", failing),
+        StaticWeatherProvider("slow", lambda location: {**READING, "rainfall_24h": 1.0}, latency=0.3),
+        StaticWeatherProvider("fast", lambda location: READING, latency=0.02),
+    ])
+
+    result = composite.current_conditions(LOCATION)
+    settle(composite)
+
+    assert result["provider"] == "fast"
+    assert result["rainfall_24h"] == 12.5
+    stats = composite.stats()
+    assert stats["broken"]["errors"] == 1 and stats["broken"]["valid"] == 0
+    assert stats["slow"] == {**stats["slow"], "calls": 1, "valid": 1, "wins": 0}
+    assert stats["fast"] == {**stats["fast"], "calls": 1, "valid": 1, "wins": 1, "win_rate": 1.0}
+
+
+def test_fastest_ignores_non_live_and_too_old_readings():
+    composite = CompositeWeatherProvider([
+        StaticWeatherProvider("cache", lambda location: READING, source="stale-cache"),
+        StaticWeatherProvider("old", lambda location: {**READING, "observation_time": observed(90)}),
+        StaticWeatherProvider("fresh", lambda location: READING, latency=0.05),
+    ], max_age=1800)
+
+    assert composite.current_conditions(LOCATION)["provider"] == "fresh"
+
+
+def test_falls_back_in_provider_order_when_nothing_is_live():
+    composite = CompositeWeatherProvider([
+        StaticWeatherProvider("none", {}),
+        StaticWeatherProvider("simulated", lambda location: READING, source="simulated"),
+        StaticWeatherProvider("cache", lambda location: READING, source="stale-cache"),
+    ])
+
+    result = composite.current_conditions(LOCATION)
+    assert result["provider"] == "simulated"
+    assert result["source"] == "simulated"
+
+
+def test_merge_prefers_most_recent_and_fills_missing_fields():
+    composite = CompositeWeatherProvider([
+        StaticWeatherProvider("older", lambda location: {"temperature": 20.0, "humidity": 80, "pressure": 1010.0,
+                                                         "observation_time": observed(20)}),
+        StaticWeatherProvider("newest", lambda location: {"temperature": 23.0, "rainfall_24h": 4.0,
+                                                          "humidity": None, "observation_time": observed(1)}),
+        StaticWeatherProvider("middle", lambda location: {"humidity": 60, "wind_speed": 7.0,
+                                                          "observation_time": observed(10)}),
+        StaticWeatherProvider("cache", lambda location: {"weather_text": "Rain"}, source="stale-cache"),
+    ], mode="merge")
+
+    result = composite.current_conditions(LOCATION)
+    settle(composite)
+
+    assert result["providers"] == ["newest", "middle", "older"]
+    assert result["provider"] == "newest"
+    assert (result["temperature"], result["rainfall_24h"]) == (23.0, 4.0)
+    assert (result["humidity"], result["wind_speed"], result["pressure"]) == (60, 7.0, 1010.0)
+    assert "weather_text" not in result
+    assert [stats["wins"] for stats in composite.stats().values()] == [0, 1, 0, 0]
+
+
+def test_repeated_provider_names_get_separate_stats():
+    composite = CompositeWeatherProvider([StaticWeatherProvider("vendor", {}),
+                                          StaticWeatherProvider("vendor", lambda location: READING)])
+    composite.current_conditions(LOCATION)
+    settle(composite)
+
+    assert list(composite.stats()) == ["vendor", "vendor#2"]
+    assert composite.stats()["vendor#2"]["wins"] == 1
+
+
+def test_station_feed_serves_nearest_fresh_station():
+    feed = StationFeedProvider(max_distance_km=25.0, max_age=3600)
+    feed.update("near", -1.30, 36.83, {"rainfall_24h": 8.0})
+    feed.update("far", -1.40, 36.95, {"rainfall_24h": 30.0})
+
+    reading = feed.current_conditions(LOCATION)
+    assert reading["station_id"] == "near"
+    assert reading["source"] == "live"
+    assert reading["rainfall_24h"] == 8.0
+
+
+def test_station_feed_marks_stale_readings():
+    feed = StationFeedProvider(max_age=3600)
+    feed.update("near", -1.30, 36.83, {"rainfall_24h": 8.0, "observation_time": observed(120)})
+
+    assert feed.current_conditions(LOCATION)["source"] == "stale-cache"
+    composite = CompositeWeatherProvider([feed, StaticWeatherProvider("vendor", lambda location: READING,
+                                                                      latency=0.02)])
+    assert composite.current_conditions(LOCATION)["provider"] == "vendor"
+
+
+def test_station_feed_without_station_or_coordinates():
+    feed = StationFeedProvider(max_distance_km=25.0)
+    assert feed.current_conditions(LOCATION) is None
+
+    feed.update("mombasa", -4.04, 39.67, {"rainfall_24h": 8.0})
+    assert feed.current_conditions(LOCATION) is None
+    assert feed.current_conditions({"key": "207195"}) is None
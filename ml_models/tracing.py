@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Opt-in Pipeline Tracing
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Nested timing spans for the location -> weather -> scoring pipeline, so a
+slow flood check can be attributed to search_cities, get_current_weather,
+payload parsing or scoring. Tracing is off by default; while disabled
+every span is a shared no-op object and costs a single flag check.
+
+Enable it in code with tracer.configure(InMemoryExporter()) or through
+the environment:
+    ECOSENTINEL_TRACE_EXPORTER=memory
+    ECOSENTINEL_TRACE_EXPORTER=jsonl:/var/log/ecosentinel/traces.jsonl
+"""
+
+import functools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("ecosentinel_current_span", default=None)
+
+
+class SpanExporter:
+    """Exporter interface: receives each finished span as a dictionary"""
+
+    def export(self, span: Dict):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InMemoryExporter(SpanExporter):
+    """Keeps finished spans in a list, for local debugging and tests"""
+
+    def __init__(self):
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict):
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+class JsonlExporter(SpanExporter):
+    """Appends finished spans to a JSON-lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict):
+        line = json.dumps(span, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Span:
+    """One timed stage of a trace, used as a context manager"""
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id",
+                 "attributes", "status", "start_time", "_start", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(8)
+        self.span_id = secrets.token_hex(4)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def set_status(self, status: str):
+        self.status = status
+
+    def __enter__(self):
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._export({
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes
+        })
+        return False
+
+
+class _NoopSpan:
+    """Shared stand-in returned while tracing is disabled"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def set_status(self, status: str):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Process-wide tracer with a pluggable exporter"""
+
+    def __init__(self):
+        self.enabled = False
+        self.exporter: Optional[SpanExporter] = None
+
+    def configure(self, exporter: Optional[SpanExporter]):
+        """Enable tracing with the given exporter, or disable it with None"""
+        if self.exporter and self.exporter is not exporter:
+            self.exporter.close()
+        self.exporter = exporter
+        self.enabled = exporter is not None
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def current_span(self):
+        if not self.enabled:
+            return NOOP_SPAN
+        return _current_span.get() or NOOP_SPAN
+
+    def _export(self, span: Dict):
+        exporter = self.exporter
+        if exporter is None:
+            return
+        try:
+            exporter.export(span)
+        except Exception as e:
+            logger.error(f"Error exporting trace span: {str(e)}")
+
+
+tracer = Tracer()
+
+
+def span(name: str, **attributes):
+    """Start a span on the process-wide tracer"""
+    return tracer.span(name, **attributes)
+
+
+def current_span():
+    """The innermost active span, or a no-op span"""
+    return tracer.current_span()
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator wrapping each call of a function in a span"""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with Span(tracer, span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def configure_from_env():
+    """Enable tracing from ECOSENTINEL_TRACE_EXPORTER (memory or jsonl:<path>)"""
+    setting = os.getenv('ECOSENTINEL_TRACE_EXPORTER', '').strip()
+    if not setting:
+        return
+    if setting == "memory":
+        tracer.configure(InMemoryExporter())
+    elif setting.startswith("jsonl:"):
+        tracer.configure(JsonlExporter(setting[len("jsonl:"):]))
+    else:
+        logger.warning(f"Unknown ECOSENTINEL_TRACE_EXPORTER '{setting}', tracing disabled")
+
+
+configure_from_env()
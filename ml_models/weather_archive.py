@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Bulk AccuWeather Archive Ingestion
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Streams archived current-conditions and hourly-forecast JSON dumps into
+NumPy structured arrays (or columnar .npz / Parquet files) holding just
+the fields the predictor uses. Field paths are compiled once into a
+flat extractor function instead of chains of nested .get() calls, and
+files are parsed in parallel worker processes.
+
+Supported archive files:
+    *.json / *.json.gz    - one API response (object or list of objects)
+    *.jsonl / *.jsonl.gz  - one API response per line
+
+A record may be a raw payload, or a wrapper {"location_key": ...,
+"issued_at": ..., "payload": ...}. Without a wrapper the location key is
+the file name up to the first "_" and the issue time is the timestamp
+after it (e.g. 207195_2024-05-01T06.json). Hourly forecast records keep
+the issue time so forecast lead times can be recovered.
+
+Output files are written part by part as each archive file is parsed;
+records are sorted by location and time within each file.
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Field name -> (dtype, candidate paths); the first path present wins
+CURRENT_FIELDS: Dict[str, Tuple[str, Sequence[Tuple[str, ...]]]] = {
+    "epoch_time": ("i8", [("EpochTime",)]),
+    "temperature": ("f4", [("Temperature", "Metric", "Value")]),
+    "humidity": ("f4", [("RelativeHumidity",), ("Humidity",)]),
+    "rainfall_24h": ("f4", [("PrecipitationSummary", "Past24Hours", "Metric", "Value")]),
+    "wind_speed": ("f4", [("Wind", "Speed", "Metric", "Value")]),
+    "pressure": ("f4", [("Pressure", "Metric", "Value")]),
+}
+
+HOURLY_FIELDS: Dict[str, Tuple[str, Sequence[Tuple[str, ...]]]] = {
+    "epoch_time": ("i8", [("EpochDateTime",)]),
+    "temperature": ("f4", [("Temperature", "Value")]),
+    "humidity": ("f4", [("RelativeHumidity",), ("Humidity",)]),
+    "rain": ("f4", [("Rain", "Value")]),
+    "wind_speed": ("f4", [("Wind", "Speed", "Value")]),
+    "precipitation_probability": ("f4", [("PrecipitationProbability",)]),
+}
+
+KINDS = {"current": CURRENT_FIELDS, "hourly": HOURLY_FIELDS}
+
+# Width of the fixed-width location_key column; longer keys are rejected as malformed
+LOCATION_KEY_WIDTH = 64
+
+
+def compile_extractor(fields: Dict[str, Tuple[str, Sequence[Tuple[str, ...]]]]) -> Callable[[Dict], tuple]:
+    """
+    Compile field paths into one function returning a tuple of values.
+
+    Missing fields become NaN for floats and 0 for integers.
+    """
+    lines = ["def extract(r):"]
+    for i, (name, (dtype, paths)) in enumerate(fields.items()):
+        missing = "0" if dtype.startswith("i") else "nan"
+        for j, path in enumerate(paths):
+            access = "r" + "".join(f"[{key!r}]" for key in path)
+            indent = "    " * (j + 1)
+            lines.append(f"{indent}try:")
+            lines.append(f"{indent}    v{i} = {access}")
+            lines.append(f"{indent}    if v{i} is None: raise KeyError")
+            lines.append(f"{indent}except (KeyError, TypeError, IndexError):")
+        lines.append(f"{'    ' * (len(paths) + 1)}v{i} = {missing}")
+    lines.append(f"    return ({', '.join(f'v{i}' for i in range(len(fields)))},)")
+
+    namespace = {"nan": float("nan")}
+    exec(compile("\n".join(lines), "<weather_archive.extract>", "exec"), namespace)
+    return namespace["extract"]
+
+
+_extractors: Dict[str, Callable[[Dict], tuple]] = {}
+
+
+def get_extractor(kind: str) -> Callable[[Dict], tuple]:
+    """Compiled extractor for a payload kind, built once per process"""
+    if kind not in _extractors:
+        _extractors[kind] = compile_extractor(KINDS[kind])
+    return _extractors[kind]
+
+
+def record_dtype(kind: str) -> np.dtype:
+    """Structured dtype for one ingested record"""
+    metadata = [("location_key", f"U{LOCATION_KEY_WIDTH}")]
+    if kind == "hourly":
+        metadata.append(("issued_at", "i8"))
+    return np.dtype(metadata + [(name, dtype) for name, (dtype, _) in KINDS[kind].items()])
+
+
+def _open(path: str):
+    return gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, encoding="utf-8")
+
+
+def _epoch_seconds(value) -> int:
+    """Epoch seconds from a number or ISO 8601 string (naive times are UTC), 0 if unknown"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    try:
+        moment = datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return 0
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def iter_payloads(path: str) -> Iterator[Tuple[str, int, Dict]]:
+    """
+    Stream (location_key, issued_at, payload) triples from one archive file.
+
+    issued_at is when the response was fetched, in epoch seconds: the
+    wrapper's "issued_at", else the timestamp in the file name after the
+    first "_", else 0.
+    """
+    name = os.path.basename(path).split(".")[0]
+    default_key, _, stamp = name.partition("_")
+    default_issued_at = _epoch_seconds(stamp) if stamp else 0
+    streaming = path.endswith((".jsonl", ".jsonl.gz"))
+
+    with _open(path) as f:
+        documents = (json.loads(line) for line in f if line.strip()) if streaming else [json.load(f)]
+        for document in documents:
+            for item in document if isinstance(document, list) else [document]:
+                location_key, issued_at = default_key, default_issued_at
+                payload = item
+                if isinstance(item, dict) and "payload" in item:
+                    location_key = str(item.get("location_key", default_key))
+                    if item.get("issued_at") is not None:
+                        issued_at = _epoch_seconds(item["issued_at"])
+                    payload = item["payload"]
+                for record in payload if isinstance(payload, list) else [payload]:
+                    if isinstance(record, dict):
+                        yield location_key, issued_at, record
+
+
+def ingest_file(path: str, kind: str = "current") -> Tuple[np.ndarray, int]:
+    """
+    Parse one archive file into a structured array.
+
+    A file that fails to read or decode partway (e.g. a truncated gzip
+    stream or a corrupt JSON line) keeps the records read before the
+    error and counts the unreadable rest as one malformed record.
+
+    Returns:
+        (records sorted by location_key and epoch_time, number of
+        malformed records skipped)
+    """
+    extract = get_extractor(kind)
+    dtype = record_dtype(kind)
+    hourly = kind == "hourly"
+    rows = []
+    malformed = 0
+    try:
+        for location_key, issued_at, record in iter_payloads(path):
+            # Longer keys would be silently truncated by the fixed-width column
+            if len(location_key) > LOCATION_KEY_WIDTH:
+                malformed += 1
+                continue
+            metadata = (location_key, issued_at) if hourly else (location_key,)
+            rows.append(metadata + extract(record))
+    except (OSError, EOFError, ValueError) as e:
+        malformed += 1
+        logger.error(f"Error reading archive file {path} after {len(rows)} records: {str(e)}")
+
+    try:
+        records = np.array(rows, dtype=dtype)
+    except (TypeError, ValueError):
+        # Slow path: convert record by record and drop the ones that do not fit
+        good = []
+        for row in rows:
+            try:
+                good.append(np.array([row], dtype=dtype))
+            except (TypeError, ValueError):
+                malformed += 1
+        records = np.concatenate(good) if good else np.empty(0, dtype=dtype)
+
+    if malformed:
+        logger.warning(f"Skipped {malformed} malformed records in {path}")
+    return records[np.lexsort((records["epoch_time"], records["location_key"]))], malformed
+
+
+def find_archive_files(paths: Sequence[str]) -> List[str]:
+    """Expand files and directories into a sorted list of archive files"""
+    suffixes = (".json", ".jsonl", ".json.gz", ".jsonl.gz")
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names if name.endswith(suffixes))
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def iter_ingested(paths: Sequence[str], kind: str = "current", workers: int = 1) -> Iterator[Tuple[np.ndarray, int]]:
+    """
+    Ingest archive files one at a time, yielding each file's result in file order.
+
+    Args:
+        paths: Archive files and/or directories to search recursively
+        kind: "current" for current conditions, "hourly" for hourly forecasts
+        workers: Number of parallel worker processes
+
+    Yields:
+        (records, malformed) per file, as returned by ingest_file
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown archive kind '{kind}', expected one of {', '.join(KINDS)}")
+
+    files = find_archive_files(paths)
+    logger.info(f"Ingesting {len(files)} {kind} archive files with {workers} workers")
+
+    if workers > 1 and len(files) > 1:
+        # Bounded in-flight window keeps memory flat while parts are written out
+        with ProcessPoolExecutor(workers) as pool:
+            in_flight = deque()
+            for path in files:
+                in_flight.append(pool.submit(ingest_file, path, kind))
+                if len(in_flight) >= 2 * workers:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+    else:
+        for path in files:
+            yield ingest_file(path, kind)
+
+
+def ingest(paths: Sequence[str], kind: str = "current", workers: int = 1) -> np.ndarray:
+    """
+    Ingest archive files and directories into one in-memory structured array.
+
+    Use ColumnarWriter with iter_ingested for archives that do not fit in memory.
+
+    Returns:
+        Structured array sorted by location_key and epoch_time
+    """
+    parts = [records for records, _ in iter_ingested(paths, kind, workers)]
+    records = np.concatenate(parts) if parts else np.empty(0, dtype=record_dtype(kind))
+    return records[np.lexsort((records["epoch_time"], records["location_key"]))]
+
+
+class ColumnarWriter:
+    """
+    Incremental column-per-field writer for ingested records.
+
+    Parquet output gets one row group per written part. For .npz output
+    each column is spilled to a raw file as parts arrive and compressed
+    into the archive from memory maps on close, so neither format holds
+    the whole archive in memory.
+    """
+
+    def __init__(self, output_path: str, kind: str = "current"):
+        self.output_path = output_path
+        self.dtype = record_dtype(kind)
+        self.rows = 0
+        self._parquet = None
+        self._spill_dir = None
+        if not output_path.endswith(".parquet"):
+            self._spill_dir = tempfile.mkdtemp(prefix=".ingest-", dir=os.path.dirname(os.path.abspath(output_path)))
+
+    def write(self, records: np.ndarray):
+        """Append one part to the output"""
+        if not len(records):
+            return
+        if self._spill_dir is None:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.table({name: records[name] for name in self.dtype.names})
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.output_path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            for name in self.dtype.names:
+                with open(os.path.join(self._spill_dir, name), "ab") as f:
+                    np.ascontiguousarray(records[name]).tofile(f)
+        self.rows += len(records)
+
+    def close(self):
+        """Finish the output file"""
+        if self._spill_dir is None:
+            if self._parquet is None:
+                import pandas as pd
+                pd.DataFrame({name: np.empty(0, dtype=self.dtype[name]) for name in self.dtype.names}).to_parquet(
+                    self.output_path, index=False)
+            else:
+                self._parquet.close()
+            return
+
+        columns = {}
+        for name in self.dtype.names:
+            spill_path = os.path.join(self._spill_dir, name)
+            columns[name] = (np.memmap(spill_path, dtype=self.dtype[name], mode="r", shape=(self.rows,))
+                             if self.rows else np.empty(0, dtype=self.dtype[name]))
+        np.savez_compressed(self.output_path, **columns)
+        del columns
+        shutil.rmtree(self._spill_dir, ignore_errors=True)
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def save_columnar(records: np.ndarray, output_path: str):
+    """Write ingested records as a column-per-field .npz or Parquet file"""
+    kind = "hourly" if "issued_at" in records.dtype.names else "current"
+    with ColumnarWriter(output_path, kind) as writer:
+        writer.write(records)
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Ingest archived AccuWeather JSON into columnar arrays")
+    parser.add_argument("paths", nargs="+", help="Archive files or directories")
+    parser.add_argument("--output", required=True, help="Output .npz or .parquet file")
+    parser.add_argument("--kind", choices=sorted(KINDS), default="current", help="Payload kind")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args()
+
+    start = datetime.now()
+    locations, malformed = set(), 0
+    with ColumnarWriter(args.output, args.kind) as writer:
+        for records, skipped in iter_ingested(args.paths, kind=args.kind, workers=args.workers):
+            writer.write(records)
+            locations.update(np.unique(records["location_key"]).tolist())
+            malformed += skipped
+
+    elapsed = (datetime.now() - start).total_seconds()
+    print(f"✅ Ingested {writer.rows:,} {args.kind} records for {len(locations):,} locations "
+          f"in {elapsed:.1f}s -> {args.output}")
+    if malformed:
+        print(f"⚠️  Skipped {malformed:,} malformed records")
+
+
+if __name__ == "__main__":
+    main()
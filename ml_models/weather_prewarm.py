@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Background Weather Pre-Warming Scheduler
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+Keeps location and weather data warm in the predictor's in-memory cache
+for a watch-list of hotspots (Kibera, Mathare, Kisumu, ...) so that
+interactive flood checks never wait on AccuWeather.
+"""
+
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from ecosentinel_predictor import EcoSentinelPredictor
+
+logger = logging.getLogger(__name__)
+
+# Refresh interval multiplier per flood risk level: riskier places refresh more often
+RISK_INTERVAL_FACTORS = {"HIGH": 0.25, "MEDIUM": 0.5, "LOW": 1.0}
+
+
+class TokenBucket:
+    """
+    Simple thread-safe token bucket used to keep refreshes within the API quota.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated_at = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Try to take tokens from the bucket.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the number of seconds
+            to wait before enough tokens are available
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+
+class PrewarmScheduler:
+    """
+    Background scheduler that refreshes weather for watch-listed locations.
+
+    Refreshes are staggered evenly across the base interval so they never
+    burst, rate-limited by a token bucket sized from the daily API quota,
+    and rescheduled more often for locations currently at MEDIUM or HIGH
+    flood risk.
+    """
+
+    def __init__(self,
+                 predictor: EcoSentinelPredictor,
+                 watch_list: List[str],
+                 base_interval: Optional[float] = None,
+                 daily_call_quota: Optional[int] = None,
+                 min_interval: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            predictor: Predictor whose caches should be kept warm
+            watch_list: City names to keep warm
+            base_interval: Refresh interval in seconds for LOW risk locations
+                (default: PREWARM_INTERVAL_MINUTES or 30 minutes)
+            daily_call_quota: Upstream calls allowed per day
+                (default: ACCUWEATHER_DAILY_QUOTA or 50, the free tier)
+            min_interval: Lower bound on any location's refresh interval
+            clock: Monotonic time source in seconds
+        """
+        self.predictor = predictor
+        self.base_interval = base_interval or float(os.getenv('PREWARM_INTERVAL_MINUTES', 30)) * 60
+        self.daily_call_quota = daily_call_quota or int(os.getenv('ACCUWEATHER_DAILY_QUOTA', 50))
+        self.min_interval = min_interval
+        self.clock = clock
+
+        # Each refresh costs one current-conditions call; allow a small burst
+        self.bucket = TokenBucket(self.daily_call_quota / 86400.0, capacity=max(1.0, len(watch_list) / 10),
+                                  clock=clock)
+
+        self._queue: List[tuple] = []
+        self._status: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        for city_name in watch_list:
+            self.add_location(city_name)
+
+    def add_location(self, city_name: str):
+        """Add a city to the watch-list, staggered into the current schedule"""
+        with self._lock:
+            if city_name in self._status:
+                return
+            # Golden-ratio stagger spreads first refreshes evenly over one
+            # base interval however many locations are added later
+            offset = (len(self._status) * 0.6180339887 % 1.0) * self.base_interval
+            self._status[city_name] = {"risk_level": None, "last_refresh": None, "failures": 0}
+            heapq.heappush(self._queue, (self.clock() + offset, city_name))
+        self._wakeup.set()
+
+    def remove_location(self, city_name: str):
+        """Remove a city from the watch-list"""
+        with self._lock:
+            self._status.pop(city_name, None)
+            self._queue = [item for item in self._queue if item[1] != city_name]
+            heapq.heapify(self._queue)
+
+    def start(self):
+        """Start the background refresh thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ecosentinel-prewarm", daemon=True)
+        self._thread.start()
+        logger.info(f"Pre-warming scheduler started for {len(self._status)} locations")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the background refresh thread"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info("Pre-warming scheduler stopped")
+
+    def status(self) -> Dict[str, Dict]:
+        """Return the refresh status of every watch-listed location"""
+        with self._lock:
+            return {city: dict(info) for city, info in self._status.items()}
+
+    def next_interval(self, risk_level: Optional[str]) -> float:
+        """
+        Compute the refresh interval for a location at a given risk level.
+
+        When the watch-list wants more calls than the daily quota allows,
+        the quota is split by risk weight (the inverse of the interval
+        factor), so HIGH locations keep a larger share of the calls and
+        LOW locations absorb the shortfall.
+        """
+        factor = RISK_INTERVAL_FACTORS.get(risk_level, 1.0)
+        interval = self.base_interval * factor
+        total_weight = sum(1.0 / RISK_INTERVAL_FACTORS.get(info["risk_level"], 1.0)
+                           for info in self._status.values())
+        quota_floor = total_weight * factor * 86400.0 / self.daily_call_quota
+        return max(self.min_interval, quota_floor, interval)
+
+    def refresh(self, city_name: str) -> Optional[Dict]:
+        """
+        Refresh one location now and record its risk level.
+
+        A refresh without live weather counts as a failure and keeps the
+        last known risk level.
+        """
+        try:
+            result = self.predictor.refresh_location(city_name)
+        except Exception as e:
+            logger.error(f"Error pre-warming {city_name}: {str(e)}")
+            result = None
+
+        with self._lock:
+            info = self._status.get(city_name)
+            if info is not None:
+                if result:
+                    info["risk_level"] = result["risk_level"]
+                    info["last_refresh"] = result["updated_at"]
+                    info["failures"] = 0
+                else:
+                    info["failures"] += 1
+        return result
+
+    def run_due(self) -> Optional[float]:
+        """
+        Refresh the next location if it is due and the quota allows it.
+
+        Returns:
+            Seconds to wait before trying again (0.0 after a refresh), or
+            None if the watch-list is empty
+        """
+        with self._lock:
+            if not self._queue:
+                return None
+            due_at, city_name = self._queue[0]
+
+        delay = due_at - self.clock()
+        if delay > 0:
+            return delay
+
+        wait = self.bucket.try_acquire()
+        if wait > 0:
+            return wait
+
+        with self._lock:
+            if not self._queue or self._queue[0][1] != city_name:
+                return 0.0
+            heapq.heappop(self._queue)
+
+        self.refresh(city_name)
+
+        with self._lock:
+            info = self._status.get(city_name)
+            if info is not None:
+                interval = self.next_interval(info["risk_level"])
+                # Back off on repeated failures instead of hammering a broken endpoint
+                interval *= min(8, 2 ** info["failures"]) if info["failures"] else 1
+                heapq.heappush(self._queue, (self.clock() + interval, city_name))
+        return 0.0
+
+    def _run(self):
+        while not self._stop.is_set():
+            delay = self.run_due()
+            if delay == 0.0:
+                continue
+            # Woken early when locations are added or the scheduler stops
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+
+
+def main():
+    """Demo: keep a handful of hotspots warm, then serve a flood check from memory"""
+    print("🔥 EcoSentinel AI - Weather Pre-Warming Scheduler")
+    print("=" * 50)
+
+    predictor = EcoSentinelPredictor()
+    predictor.load_models()
+
+    scheduler = PrewarmScheduler(predictor, ["Nairobi"], base_interval=600, daily_call_quota=5000)
+    scheduler.start()
+    time.sleep(1)
+
+    start = time.perf_counter()
+    result = predictor.predict_flood_risk_with_location("Nairobi")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"🌊 Nairobi flood risk: {result.get('risk_level')} ({elapsed_ms:.1f} ms)")
+    for city, info in scheduler.status().items():
+        print(f"   {city}: risk={info['risk_level']} last_refresh={info['last_refresh']}")
+
+    scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
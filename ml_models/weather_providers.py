@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+EcoSentinel AI - Pluggable Weather Providers
+Copyright (c) 2025 Gideon Kiprono & EcoSentinel AI Team
+
+A small provider interface for current weather conditions, so the
+predictor is not tied to a single vendor. AccuWeatherAPI implements it;
+CompositeWeatherProvider queries several providers in parallel and
+either takes the first valid answer or merges all answers under a
+freshness limit, keeping per-provider latency and win-rate statistics.
+StaticWeatherProvider and StationFeedProvider are local stand-ins for
+tests and for on-site station data.
+"""
+
+import logging
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+from circuit_breaker import LatencyTracker
+from deadline import Deadline
+from tracing import current_span, traced
+
+logger = logging.getLogger(__name__)
+
+# Keys of a normalized current-conditions reading
+WEATHER_FIELDS = ("temperature", "humidity", "rainfall_24h", "wind_speed", "pressure", "weather_text")
+
+
+class WeatherProvider:
+    """
+    Provider interface: current conditions for a location, normalized.
+
+    A location is a dict with a provider-neutral "key" and, when known,
+    "latitude" and "longitude". A reading is a dict with WEATHER_FIELDS,
+    "observation_time" (ISO 8601) and "source" ("live" for a fresh
+    upstream answer, otherwise e.g. "stale-cache" or "simulated").
+    """
+
+    name = "provider"
+
+    def current_conditions(self, location: Dict, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        raise NotImplementedError
+
+
+def observation_age(reading: Dict, now: Optional[float] = None) -> float:
+    """Seconds since a reading was observed, or infinity if unknown"""
+    try:
+        observed = datetime.fromisoformat(str(reading["observation_time"]).replace("Z", "+00:00"))
+    except (KeyError, ValueError):
+        return math.inf
+    if observed.tzinfo is None:
+        observed = observed.astimezone()  # Naive times are local
+    return (now if now is not None else time.time()) - observed.timestamp()
+
+
+class ProviderStats:
+    """Call, win and latency counters for one provider in a composite"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.valid = 0
+        self.errors = 0
+        self.wins = 0
+        self.latency = LatencyTracker(min_samples=1)
+
+    def summary(self) -> Dict:
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        return {
+            "calls": self.calls,
+            "valid": self.valid,
+            "errors": self.errors,
+            "wins": self.wins,
+            "win_rate": round(self.wins / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+
+class CompositeWeatherProvider(WeatherProvider):
+    """
+    Queries several providers in parallel.
+
+    In "fastest" mode the first live reading that is fresh enough wins and
+    slower providers finish in the background. In "merge" mode all
+    answers that arrive in time are combined field by field, preferring
+    the most recent observation. If no live reading arrives, the first
+    fallback reading in provider order is returned.
+    """
+
+    name = "composite"
+    MODES = ("fastest", "merge")
+
+    def __init__(self,
+                 providers: Sequence[WeatherProvider],
+                 mode: str = "fastest",
+                 max_age: Optional[float] = None,
+                 timeout: float = 10.0):
+        """
+        Args:
+            providers: Providers to query, in fallback order
+            mode: "fastest" or "merge"
+            max_age: Readings observed longer ago than this (seconds) do
+                not count as valid (default: no limit)
+            timeout: Longest wait for answers when no deadline is given
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown composite mode '{mode}', expected one of {', '.join(self.MODES)}")
+        if not providers:
+            raise ValueError("CompositeWeatherProvider needs at least one provider")
+
+        self.providers = list(providers)
+        self.mode = mode
+        self.max_age = max_age
+        self.timeout = timeout
+        # Stats keys are provider names, suffixed where names repeat
+        self._keys: List[str] = []
+        for provider in self.providers:
+            seen = sum(1 for key in self._keys if key.split("#")[0] == provider.name)
+            self._keys.append(f"{provider.name}#{seen + 1}" if seen else provider.name)
+        self._stats = {key: ProviderStats(p.name) for key, p in zip(self._keys, self.providers)}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4 * len(self.providers),
+                                            thread_name_prefix="ecosentinel-provider")
+
+    def _is_valid(self, reading: Optional[Dict], now: float) -> bool:
+        if not reading or reading.get("source") != "live":
+            return False
+        return self.max_age is None or observation_age(reading, now) <= self.max_age
+
+    def _call(self, index: int, location: Dict, deadline: Optional[Deadline]) -> Optional[Dict]:
+        stats = self._stats[self._keys[index]]
+        start = time.perf_counter()
+        try:
+            reading = self.providers[index].current_conditions(location, deadline)
+        except Exception as e:
+            logger.error(f"Weather provider '{stats.name}' failed: {str(e)}")
+            with self._lock:
+                stats.calls += 1
+                stats.errors += 1
+            return None
+        stats.latency.add(time.perf_counter() - start)
+        with self._lock:
+            stats.calls += 1
+            stats.valid += self._is_valid(reading, time.time())
+        return reading
+
+    @traced("weather.composite")
+    def current_conditions(self, location: Dict, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        timeout = deadline.remaining() if deadline else self.timeout
+        futures = {self._executor.submit(self._call, i, location, deadline): i for i in range(len(self.providers))}
+        answers: Dict[int, Optional[Dict]] = {}
+        started = time.monotonic()
+
+        pending = set(futures)
+        while pending:
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                answers[futures[future]] = future.result()
+            if self.mode == "fastest":
+                now = time.time()
+                winners = [i for i in answers if self._is_valid(answers[i], now)]
+                if winners:
+                    return self._finish(winners[0], {**answers[winners[0]]})
+
+        now = time.time()
+        valid = [i for i in sorted(answers) if self._is_valid(answers[i], now)]
+        if valid and self.mode == "merge":
+            return self._merge(valid, answers, now)
+
+        # Nothing live and fresh: fall back in provider order
+        for i in sorted(answers):
+            if answers[i]:
+                current_span().set_attribute("provider", self.providers[i].name)
+                return {**answers[i], "provider": self.providers[i].name}
+        return None
+
+    def _finish(self, index: int, reading: Dict) -> Dict:
+        with self._lock:
+            self._stats[self._keys[index]].wins += 1
+        current_span().set_attribute("provider", self.providers[index].name)
+        reading["provider"] = self.providers[index].name
+        return reading
+
+    def _merge(self, indices: List[int], answers: Dict[int, Optional[Dict]], now: float) -> Dict:
+        """Field-wise merge preferring the most recent observation"""
+        by_recency = sorted(indices, key=lambda i: observation_age(answers[i], now))
+        merged = dict(answers[by_recency[0]])
+        for i in by_recency[1:]:
+            for field in WEATHER_FIELDS:
+                if merged.get(field) is None and answers[i].get(field) is not None:
+                    merged[field] = answers[i][field]
+        merged = self._finish(by_recency[0], merged)
+        merged["providers"] = [self.providers[i].name for i in by_recency]
+        return merged
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-provider calls, valid answers, errors, wins, win rate and latency percentiles"""
+        with self._lock:
+            return {key: stats.summary() for key, stats in self._stats.items()}
+
+
+class StaticWeatherProvider(WeatherProvider):
+    """
+    Local stand-in provider serving fixed or computed readings.
+
+    Readings may be a dict by location key or a callable taking the
+    location; a latency (seconds) can be injected to exercise races.
+    """
+
+    def __init__(self,
+                 name: str,
+                 readings,
+                 latency: float = 0.0,
+                 source: str = "live"):
+        self.name = name
+        self.readings = readings
+        self.latency = latency
+        self.source = source
+
+    def current_conditions(self, location: Dict, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        if self.latency:
+            time.sleep(self.latency)
+        reading = self.readings(location) if callable(self.readings) else self.readings.get(location.get("key"))
+        if reading is None:
+            return None
+        return {
+            "observation_time": datetime.now(timezone.utc).isoformat(),
+            "source": self.source,
+            **reading
+        }
+
+
+class StationFeedProvider(WeatherProvider):
+    """
+    Latest readings from local weather stations, served by nearest station.
+
+    Station readings are pushed with update() (for example by a gauge
+    ingestion job); lookups need the location's coordinates. A reading
+    observed longer ago than max_age is served as "stale-cache".
+    """
+
+    name = "station-feed"
+
+    def __init__(self, max_distance_km: float = 25.0, max_age: Optional[float] = 3600.0):
+        """
+        Args:
+            max_distance_km: Farthest station that may answer for a location
+            max_age: Seconds after which a station reading is no longer
+                live (None: no limit)
+        """
+        self.max_distance_km = max_distance_km
+        self.max_age = max_age
+        self._stations: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def update(self, station_id: str, latitude: float, longitude: float, reading: Dict):
+        """Record a station's latest reading (WEATHER_FIELDS subset, optional observation_time)"""
+        reading = {"observation_time": datetime.now(timezone.utc).isoformat(), **reading}
+        with self._lock:
+            self._stations[station_id] = {"latitude": latitude, "longitude": longitude, "reading": reading}
+
+    def current_conditions(self, location: Dict, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        latitude, longitude = location.get("latitude"), location.get("longitude")
+        if latitude is None or longitude is None:
+            return None
+
+        best, best_distance = None, self.max_distance_km
+        with self._lock:
+            stations = list(self._stations.items())
+        for station_id, station in stations:
+            dlat = math.radians(station["latitude"] - latitude)
+            dlon = math.radians(station["longitude"] - longitude) * math.cos(math.radians(latitude))
+            distance = 6371.0 * math.hypot(dlat, dlon)
+            if distance <= best_distance:
+                best, best_distance = (station_id, station), distance
+
+        if best is None:
+            return None
+        station_id, station = best
+        fresh = self.max_age is None or observation_age(station["reading"]) <= self.max_age
+        return {**station["reading"], "station_id": station_id,
+                "station_distance_km": round(best_distance, 2), "source": "live" if fresh else "stale-cache"}
+
+
+def main():
+    """Demo: race a slow and a fast stand-in provider"""
+    print("🛰️ EcoSentinel AI - Weather Providers")
+    print("=" * 50)
+
+    reading = {"temperature": 22.0, "humidity": 70, "rainfall_24h": 12.5, "wind_speed": 9.0,
+               "pressure": 1012.0, "weather_text": "Showers"}
+    composite = CompositeWeatherProvider([
+        StaticWeatherProvider("slow-vendor", lambda location: reading, latency=0.3),
+        StaticWeatherProvider("fast-vendor", lambda location: {**reading, "rainfall_24h": 13.0}, latency=0.05),
+    ])
+
+    for _ in range(5):
+        result = composite.current_conditions({"key": "207195"})
+        print(f"   Winner: {result['provider']}, rainfall {result['rainfall_24h']} mm")
+
+    time.sleep(0.4)
+    for name, stats in composite.stats().items():
+        print(f"   {name}: {stats}")
+
+
+if __name__ == "__main__":
+    main()